@@ -1,7 +1,15 @@
+import logging
+
 from flask import Flask, session
 from config import Config
 from data_manager import data_manager
 
+# App modules log through `logging`; their debug diagnostics only show outside production
+logging.basicConfig(level=logging.INFO, format="%(message)s")
+if Config.DEBUG:
+    for app_logger in ("garmin_manager", "services"):
+        logging.getLogger(app_logger).setLevel(logging.DEBUG)
+
 def create_app():
     """Application factory"""
     app = Flask(__name__)
@@ -1,4 +1,6 @@
 # garmin_manager.py
+import logging
+
 from garminconnect import (
     Garmin,
     GarminConnectConnectionError,
@@ -7,6 +9,11 @@ from garminconnect import (
 )
 from datetime import date, timedelta
 
+logger = logging.getLogger(__name__)
+
+# Readiness compares today's HRV against this many days of history
+HRV_BASELINE_DAYS = 14
+
 
 def serialize_mfa_state(state):
     """
@@ -78,7 +85,7 @@ class GarminManager:
             self.garmin.login(tokenstore=tokenstore)
             return True
         except (GarminConnectConnectionError, GarminConnectTooManyRequestsError, GarminConnectAuthenticationError) as e:
-            print(f"Error logging into Garmin: {e}")
+            logger.warning("Error logging into Garmin: %s", e)
             return False
 
     def get_tokenstore(self):
@@ -118,7 +125,7 @@ class GarminManager:
                 pass
             return False, (token1, token2)
         except (GarminConnectConnectionError, GarminConnectTooManyRequestsError, GarminConnectAuthenticationError) as e:
-            print(f"Error in Garmin login (step1 MFA): {e}")
+            logger.warning("Error in Garmin login (step1 MFA): %s", e)
             return False, None
 
     def resume_login(self, mfa_state, mfa_code):
@@ -131,16 +138,16 @@ class GarminManager:
             return False
         client_state = _extract_client_state(mfa_state)
         if not client_state:
-            print("Garmin 2FA: could not find client_state dict (with 'client' key) in mfa_state")
+            logger.warning("Garmin 2FA: could not find client_state dict (with 'client' key) in mfa_state")
             return False
         try:
             self.garmin.resume_login(client_state, mfa_code.strip())
             return True
         except (GarminConnectConnectionError, GarminConnectTooManyRequestsError, GarminConnectAuthenticationError) as e:
-            print(f"Error in Garmin resume_login (2FA): {e}")
+            logger.warning("Error in Garmin resume_login (2FA): %s", e)
             return False
         except TypeError as e:
-            print(f"Garmin 2FA TypeError (wrong client_state type): {e}")
+            logger.warning("Garmin 2FA TypeError (wrong client_state type): %s", e)
             return False
 
     def get_health_stats(self, target_date_iso):
@@ -158,26 +165,26 @@ class GarminManager:
         try:
             stats["hrv"] = self.garmin.get_hrv_data(target_date_iso)
         except Exception as e:
-            print(f"Could not fetch HRV data for {target_date_iso}: {e}")
+            logger.warning("Could not fetch HRV data for %s: %s", target_date_iso, e)
 
         try:
             stats["sleep"] = self.garmin.get_sleep_data(target_date_iso)
         except Exception as e:
-            print(f"Could not fetch sleep data for {target_date_iso}: {e}")
+            logger.warning("Could not fetch sleep data for %s: %s", target_date_iso, e)
 
         try:
             stats["body_battery"] = self.garmin.get_body_battery(target_date_iso)
         except Exception as e:
-            print(f"Could not fetch Body Battery data for {target_date_iso}: {e}")
+            logger.warning("Could not fetch Body Battery data for %s: %s", target_date_iso, e)
 
         try:
             stats["training_status"] = self.garmin.get_training_status(target_date_iso)
         except Exception as e:
-            print(f"Could not fetch Training Status data for {target_date_iso}: {e}")
+            logger.warning("Could not fetch Training Status data for %s: %s", target_date_iso, e)
 
         # Only return a complete failure if ALL data points are missing.
         if all(value is None for key, value in stats.items() if key != "fetch_date"):
-            print(f"All Garmin health stat fetches failed for {target_date_iso}.")
+            logger.warning("All Garmin health stat fetches failed for %s.", target_date_iso)
             return None
 
         return stats
@@ -200,7 +207,8 @@ class GarminManager:
         
         return stats_range
 
-    def extract_key_metrics(self, stats, debug=False):
+    @staticmethod
+    def extract_key_metrics(stats, debug=False):
         """
         Extracts key metrics from a single day's stats for display.
         Returns a dict with cleaned values.
@@ -215,10 +223,10 @@ class GarminManager:
         - Added null safety for ACWR data
         """
         if debug:
-            print(f"\n{'='*60}")
-            print(f"DEBUG - Extracting metrics for {stats.get('fetch_date')}")
-            print(f"Available data types: {[k for k, v in stats.items() if v is not None and k != 'fetch_date']}")
-            print(f"{'='*60}")
+            logger.debug("\n%s", "=" * 60)
+            logger.debug("DEBUG - Extracting metrics for %s", stats.get('fetch_date'))
+            logger.debug("Available data types: %s", [k for k, v in stats.items() if v is not None and k != 'fetch_date'])
+            logger.debug("%s", "=" * 60)
         
         metrics = {
             "date": stats.get("fetch_date"),
@@ -283,7 +291,7 @@ class GarminManager:
                     if battery_values:
                         metrics["body_battery_high"] = max(battery_values)
                         metrics["body_battery_low"] = min(battery_values)
-                        print(f"  BB [{stats.get('fetch_date')}]: High {max(battery_values)}, Low {min(battery_values)}")
+                        logger.debug("  BB [%s]: High %s, Low %s", stats.get('fetch_date'), metrics["body_battery_high"], metrics["body_battery_low"])
                 
                 # Fallback: use top-level charged if no array
                 elif 'charged' in day_data:
@@ -306,9 +314,9 @@ class GarminManager:
         # Training Status - Extract BOTH Garmin status AND ACWR data
         if stats.get("training_status"):
             if debug:
-                print(f"\n{'='*60}")
-                print(f"DEBUG - Training Status for {stats.get('fetch_date')}")
-                print(f"{'='*60}")
+                logger.debug("\n%s", "=" * 60)
+                logger.debug("DEBUG - Training Status for %s", stats.get('fetch_date'))
+                logger.debug("%s", "=" * 60)
             
             ts_data = stats["training_status"]
             most_recent = ts_data.get("mostRecentTrainingStatus", {})
@@ -319,7 +327,7 @@ class GarminManager:
             
             if device_data:
                 if debug:
-                    print(f"DEBUG: Available device_data keys: {list(device_data.keys())}")
+                    logger.debug("DEBUG: Available device_data keys: %s", list(device_data.keys()))
                 
                 # Extract Garmin's training status phrase
                 status_phrase = device_data.get("trainingStatusFeedbackPhrase", "")
@@ -333,11 +341,11 @@ class GarminManager:
                     if vo2_max_data.get("generic") and vo2_max_data["generic"].get("vo2MaxPreciseValue"):
                         metrics["vo2_max"] = vo2_max_data["generic"]["vo2MaxPreciseValue"]
                         if debug:
-                            print(f"DEBUG: VO2 Max (Running): {metrics['vo2_max']}")
+                            logger.debug("DEBUG: VO2 Max (Running): %s", metrics['vo2_max'])
                     elif vo2_max_data.get("cycling") and vo2_max_data["cycling"].get("vo2MaxPreciseValue"):
                         metrics["vo2_max"] = vo2_max_data["cycling"]["vo2MaxPreciseValue"]
                         if debug:
-                            print(f"DEBUG: VO2 Max (Cycling): {metrics['vo2_max']}")
+                            logger.debug("DEBUG: VO2 Max (Cycling): %s", metrics['vo2_max'])
                 
                 # Extract ACWR data (the GOLD for AI coaching!)
                 # FIXED: Handle None values properly
@@ -345,38 +353,39 @@ class GarminManager:
                 
                 if acwr_data and isinstance(acwr_data, dict):
                     if debug:
-                        print(f"DEBUG: ACWR data available, keys: {list(acwr_data.keys())}")
+                        logger.debug("DEBUG: ACWR data available, keys: %s", list(acwr_data.keys()))
                     metrics["acwr_ratio"] = acwr_data.get("dailyAcuteChronicWorkloadRatio")
                     metrics["acwr_status"] = acwr_data.get("acwrStatus")  # OPTIMAL, LOW, HIGH
                     metrics["acute_load"] = acwr_data.get("dailyTrainingLoadAcute")
                     metrics["chronic_load"] = acwr_data.get("dailyTrainingLoadChronic")
                     
                     if debug:
-                        print(f"Garmin Status: {status_phrase}")
-                        print(f"ACWR Ratio: {metrics['acwr_ratio']} ({metrics['acwr_status']})")
-                        print(f"Acute Load (7d): {metrics['acute_load']}")
-                        print(f"Chronic Load (28d): {metrics['chronic_load']}")
+                        logger.debug("Garmin Status: %s", status_phrase)
+                        logger.debug("ACWR Ratio: %s (%s)", metrics['acwr_ratio'], metrics['acwr_status'])
+                        logger.debug("Acute Load (7d): %s", metrics['acute_load'])
+                        logger.debug("Chronic Load (28d): %s", metrics['chronic_load'])
                 else:
                     if debug:
-                        print(f"DEBUG: ACWR data NOT available (acwr_data={acwr_data})")
-                        print(f"DEBUG: This device may not support Training Load metrics")
+                        logger.debug("DEBUG: ACWR data NOT available (acwr_data=%s)", acwr_data)
+                        logger.debug("DEBUG: This device may not support Training Load metrics")
                     metrics["acwr_ratio"] = None
                     metrics["acwr_status"] = None
                     metrics["acute_load"] = None
                     metrics["chronic_load"] = None
                     if debug:
-                        print(f"Garmin Status: {status_phrase}")
-                        print(f"ACWR: Not available on this device")
+                        logger.debug("Garmin Status: %s", status_phrase)
+                        logger.debug("ACWR: Not available on this device")
             else:
                 if debug:
-                    print(f"DEBUG: No device_data found in training_status")
+                    logger.debug("DEBUG: No device_data found in training_status")
             
             if debug:
-                print(f"{'='*60}\n")
+                logger.debug("%s\n", "=" * 60)
 
         return metrics
     
-    def calculate_readiness_score(self, metrics_timeline):
+    @staticmethod
+    def calculate_readiness_score(metrics_timeline):
         """
         Calculate readiness score based on recovery metrics.
         Readiness = how prepared you are for an intense training session TODAY.
@@ -394,7 +403,7 @@ class GarminManager:
         
         latest = metrics_timeline[-1]
         
-        print(f"\n=== Readiness Calculation for {latest.get('date', 'unknown')} ===")
+        logger.debug("\n=== Readiness Calculation for %s ===", latest.get('date', 'unknown'))
         
         weighted_score = 0
         total_weight = 0
@@ -407,13 +416,13 @@ class GarminManager:
             weighted_score += sleep_contribution
             total_weight += 30
             metrics_used.append('sleep')
-            print(f"  Sleep: {sleep_score}/100 → {sleep_contribution:.1f} points (30% weight)")
+            logger.debug("  Sleep: %s/100 → %.1f points (30%% weight)", sleep_score, sleep_contribution)
         
         # === HRV Status (30% weight) - Deviation from 14-day baseline ===
         hrv_status = latest.get('hrv_status')
         if hrv_status and latest.get('hrv_value') is not None:
-            # Calculate 14-day HRV baseline
-            hrv_values = [day.get('hrv_value') for day in metrics_timeline if day.get('hrv_value')]
+            # Calculate 14-day HRV baseline (bounded so longer timelines don't widen it)
+            hrv_values = [day['hrv_value'] for day in metrics_timeline[-HRV_BASELINE_DAYS:] if day.get('hrv_value')]
             if len(hrv_values) >= 3:  # Need at least 3 days for baseline
                 baseline_hrv = sum(hrv_values) / len(hrv_values)
                 current_hrv = latest['hrv_value']
@@ -449,8 +458,8 @@ class GarminManager:
                 weighted_score += hrv_contribution
                 total_weight += 30
                 metrics_used.append('hrv')
-                print(f"  HRV Status: {status_text} → {hrv_contribution:.1f} points (30% weight)")
-                print(f"    Today: {current_hrv}ms | 14-day baseline: {baseline_hrv:.1f}ms")
+                logger.debug("  HRV Status: %s → %.1f points (30%% weight)", status_text, hrv_contribution)
+                logger.debug("    Today: %sms | 14-day baseline: %.1fms", current_hrv, baseline_hrv)
             else:
                 # Not enough data for baseline, use simple balanced/unbalanced
                 if hrv_status == 'BALANCED':
@@ -458,8 +467,8 @@ class GarminManager:
                     weighted_score += hrv_contribution
                     total_weight += 30
                     metrics_used.append('hrv')
-                    print(f"  HRV Status: BALANCED → {hrv_contribution} points (30% weight)")
-                    print(f"    Today: {latest.get('hrv_value')}ms (insufficient data for baseline)")
+                    logger.debug("  HRV Status: BALANCED → %s points (30%% weight)", hrv_contribution)
+                    logger.debug("    Today: %sms (insufficient data for baseline)", latest.get('hrv_value'))
         
         # === Body Battery HIGH (25% weight) - Morning recovery level ===
         # HIGH = peak after overnight recovery (what matters for readiness)
@@ -470,8 +479,8 @@ class GarminManager:
             weighted_score += bb_contribution
             total_weight += 25
             metrics_used.append('body_battery')
-            print(f"  Body Battery High: {bb_high}/100 → {bb_contribution:.1f} points (25% weight)")
-            print(f"    (Morning recovery level, not bedtime low)")
+            logger.debug("  Body Battery High: %s/100 → %.1f points (25%% weight)", bb_high, bb_contribution)
+            logger.debug("    (Morning recovery level, not bedtime low)")
         
         # === Training Status (15% weight) ===
         # Readiness perspective: RECOVERY = ready for hard work, PRODUCTIVE = fatigued
@@ -501,24 +510,24 @@ class GarminManager:
             weighted_score += ts_contribution
             total_weight += 15
             metrics_used.append('training_status')
-            print(f"  Training Status: {base_status} → {ts_contribution} points (15% weight)")
+            logger.debug("  Training Status: %s → %s points (15%% weight)", base_status, ts_contribution)
             if acwr_ratio is not None and acwr_status:
-                print(f"    ACWR: {acwr_ratio:.2f} ({acwr_status}) - Acute: {latest.get('acute_load')}, Chronic: {latest.get('chronic_load')}")
+                logger.debug("    ACWR: %.2f (%s) - Acute: %s, Chronic: %s", acwr_ratio, acwr_status, latest.get('acute_load'), latest.get('chronic_load'))
         
         # === Calculate final score ===
         if len(metrics_used) < 2:
-            print(f"  ⚠️  Insufficient data: Only {len(metrics_used)} metric(s) available")
-            print(f"  Minimum 2 metrics required for reliable readiness score")
-            print("=" * 50)
+            logger.debug("  ⚠️  Insufficient data: Only %s metric(s) available", len(metrics_used))
+            logger.debug("  Minimum 2 metrics required for reliable readiness score")
+            logger.debug("=" * 50)
             return None
         
         if total_weight > 0:
             # Normalize to 100-point scale
             final_score = round((weighted_score / total_weight) * 100)
             
-            print(f"  Metrics used: {', '.join(metrics_used)}")
-            print(f"  Final Readiness: {final_score}/100 (from {total_weight} points of data)")
-            print("=" * 50)
+            logger.debug("  Metrics used: %s", ', '.join(metrics_used))
+            logger.debug("  Final Readiness: %s/100 (from %s points of data)", final_score, total_weight)
+            logger.debug("=" * 50)
             
             return {
                 'score': final_score,
@@ -526,6 +535,6 @@ class GarminManager:
                 'data_quality': 'excellent' if len(metrics_used) >= 3 else 'moderate'
             }
         
-        print(f"  Insufficient data for readiness calculation")
-        print("=" * 50)
+        logger.debug("  Insufficient data for readiness calculation")
+        logger.debug("=" * 50)
         return None
\ No newline at end of file
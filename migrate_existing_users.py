@@ -29,7 +29,7 @@ from botocore.exceptions import ClientError
 
 from models.training_plan import TrainingPlan, TrainingMetrics, MetricValue
 from utils.migration import migrate_plan_to_v2, validate_plan_structure
-from utils.vdot_calculator import VDOTCalculator
+from utils.vdot_calculator import vdot_calculator
 
 
 def convert_decimals(obj):
@@ -384,7 +384,7 @@ def migrate_user(athlete_id: str, dry_run: bool = True, use_local: bool = False,
                     vdot_value = user_data['vdot']
                     
                     # Calculate paces from VDOT
-                    calc = VDOTCalculator()
+                    calc = vdot_calculator
                     paces = calc.get_training_paces(int(vdot_value))
                     
                     # Create VDOT metric with paces
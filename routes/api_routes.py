@@ -5,6 +5,7 @@ import time
 import os
 import jinja2
 import re
+import requests
 import threading
 from collections import defaultdict
 from config import Config
@@ -171,8 +172,30 @@ def _process_webhook_activities(athlete_id, user_data, access_token, new_activit
     friel_hr_zones = plan_data.get('friel_hr_zones') or {}
     friel_power_zones = plan_data.get('friel_power_zones') or {}
     
+    # Fetch details and streams for all activities concurrently up front
+    activity_ids = [activity_summary['id'] for activity_summary in new_activities_to_process]
+    # On the webhook timer thread a rejected token or failed request raises (no session
+    # to clear); when triggered from a request the decorator returns its redirect instead
+    try:
+        details_by_id = strava_service.get_activity_details_batch(access_token, activity_ids)
+        if not isinstance(details_by_id, dict):
+            print(f"❌ Strava rejected the token for athlete {athlete_id}, skipping activity processing")
+            return
+        streams_by_id = strava_service.get_activity_streams_batch(access_token, activity_ids)
+        # The detail endpoint often reports 0-1 laps; the dedicated laps endpoint is more reliable
+        laps_by_id = strava_service.get_activity_laps_batch(access_token, [
+            activity_id for activity_id, activity in details_by_id.items()
+            if isinstance(activity, dict) and len(activity.get('laps') or []) <= 1
+        ])
+        if not isinstance(laps_by_id, dict):
+            print(f"❌ Strava rejected the token for athlete {athlete_id}, skipping activity processing")
+            return
+    except requests.exceptions.RequestException as e:
+        print(f"❌ Strava request failed for athlete {athlete_id}: {e}")
+        return
+
     for activity_summary in new_activities_to_process:
-        activity = strava_service.get_activity_detail(access_token, activity_summary['id'])
+        activity = details_by_id.get(activity_summary['id'])
         if not activity:
             continue
         
@@ -181,7 +204,7 @@ def _process_webhook_activities(athlete_id, user_data, access_token, new_activit
         activity_laps_from_detail = activity.get('laps') or []
         if len(activity_laps_from_detail) <= 1:
             # If activity detail has 0 or 1 lap, try dedicated endpoint (might have more)
-            activity_laps = strava_service.get_activity_laps(access_token, activity['id'])
+            activity_laps = laps_by_id.get(activity_summary['id'])
             if activity_laps and len(activity_laps) > len(activity_laps_from_detail):
                 # Override laps in activity dict with data from dedicated endpoint
                 activity['laps'] = activity_laps
@@ -191,7 +214,7 @@ def _process_webhook_activities(athlete_id, user_data, access_token, new_activit
         else:
             print(f"✅ Activity detail has {len(activity_laps_from_detail)} laps - using those")
         
-        streams = strava_service.get_activity_streams(access_token, activity['id'])
+        streams = streams_by_id.get(activity_summary['id'])
         
         # Build zones dict for analysis, including power zones when available
         zones_for_analysis = {}
@@ -239,7 +262,7 @@ def _process_webhook_activities(athlete_id, user_data, access_token, new_activit
     # VDOT DETECTION - Check ALL activities, but ONLY running activities (fix for issue #87)
     if raw_activities and analyzed_sessions:
         from services.vdot_detection_service import vdot_detection_service
-        from utils.vdot_calculator import VDOTCalculator
+        from utils.vdot_calculator import vdot_calculator
         
         print("\n" + "="*70)
         print("VDOT DETECTION - DEBUG LOG (WEBHOOK - QUEUED)")
@@ -277,7 +300,7 @@ def _process_webhook_activities(athlete_id, user_data, access_token, new_activit
             
             print(f"   🔍 Checking activity {idx+1}/{len(raw_activities)}: {activity_name} (ID: {activity_id}, Race: {is_race})")
             
-            result = vdot_detection_service.calculate_vdot_from_activity(
+            result, reason = vdot_detection_service.evaluate_activity(
                 raw_activity,
                 time_in_zones
             )
@@ -298,7 +321,6 @@ def _process_webhook_activities(athlete_id, user_data, access_token, new_activit
                 vdot_candidates.append((priority, result, raw_activity, time_in_zones))
                 print(f"   ✅ Qualifies for VDOT: VDOT {result['vdot']}, Priority: {priority:.1f}")
             else:
-                should_calc, reason, _ = vdot_detection_service.should_calculate_vdot(raw_activity, time_in_zones)
                 print(f"   ❌ Does not qualify: {reason}")
         
         # Use the highest priority candidate (or first if multiple have same priority)
@@ -326,7 +348,7 @@ def _process_webhook_activities(athlete_id, user_data, access_token, new_activit
             else:
                 print(f"\n🎯 UPDATING VDOT: {current_vdot} → {new_vdot}")
                 
-                calc = VDOTCalculator()
+                calc = vdot_calculator
                 paces = calc.get_training_paces(new_vdot)
                 
                 if 'training_metrics' not in user_data:
@@ -1186,16 +1208,13 @@ def garmin_summary_api():
         if not stats_range:
             return jsonify({"error": "Could not fetch Garmin data"}), 500
 
-        # Extract metrics
-        metrics_timeline = garmin_service.extract_metrics_timeline(stats_range)
-        
-        # Calculate readiness (now returns dict with score and metadata)
-        readiness_result = garmin_service.calculate_readiness(metrics_timeline)
+        # Extract metrics, readiness (dict with score and metadata) and VO2 max changes in one pass
+        analysis = garmin_service.analyze_range(stats_range)
+        metrics_timeline = analysis['metrics']
+        readiness_result = analysis['readiness']
         readiness_score = readiness_result['score'] if readiness_result else None
         readiness_metadata = readiness_result if readiness_result else None
-        
-        # Calculate VO2 max changes
-        vo2_max_data = garmin_service.calculate_vo2_max_changes(metrics_timeline)
+        vo2_max_data = analysis['vo2_changes']
         
         today_metrics = metrics_timeline[-1] if metrics_timeline else None
         
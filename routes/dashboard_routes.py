@@ -359,15 +359,18 @@ def dashboard():
     
     # Fallback to markdown if no plan_v2 or error
     if not current_week_sessions and 'plan' in user_data and user_data.get('plan'):
+        today = date.today()
         is_finished, last_end_date = training_service.is_plan_finished(
             user_data['plan'],
-            user_data.get('plan_structure')
+            user_data.get('plan_structure'),
+            today=today
         )
         plan_finished = is_finished
         
         current_week_text = training_service.get_current_week_plan(
             user_data['plan'],
-            user_data.get('plan_structure')
+            user_data.get('plan_structure'),
+            today=today
         )
         current_week_html = render_markdown_with_toc(current_week_text)['content']
     
@@ -403,8 +406,8 @@ def dashboard():
                     # Calculate paces if not stored
                     if not vdot_paces and vdot:
                         try:
-                            from utils.vdot_calculator import VDOTCalculator
-                            calc = VDOTCalculator()
+                            from utils.vdot_calculator import vdot_calculator
+                            calc = vdot_calculator
                             vdot_paces = calc.get_training_paces(vdot)
                         except Exception as e:
                             print(f"Could not calculate VDOT paces: {e}")
@@ -1235,8 +1238,8 @@ def settings():
                 # Calculate paces if not stored
                 if not vdot_paces and vdot:
                     try:
-                        from utils.vdot_calculator import VDOTCalculator
-                        calc = VDOTCalculator()
+                        from utils.vdot_calculator import vdot_calculator
+                        calc = vdot_calculator
                         vdot_paces = calc.get_training_paces(vdot)
                     except Exception as e:
                         print(f"Could not calculate VDOT paces: {e}")
@@ -1373,10 +1376,10 @@ def update_settings():
                     existing_vdot = None
 
                 if existing_vdot != vdot_int:
-                    # Calculate training paces using VDOTCalculator
+                    # Calculate training paces using the shared VDOT calculator
                     try:
-                        from utils.vdot_calculator import VDOTCalculator
-                        calc = VDOTCalculator()
+                        from utils.vdot_calculator import vdot_calculator
+                        calc = vdot_calculator
                         paces = calc.get_training_paces(vdot_int)
                     except Exception as e:
                         print(f"Warning: Could not calculate VDOT paces: {e}")
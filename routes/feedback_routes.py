@@ -521,8 +521,22 @@ def get_feedback_api():
         else:
             print("ℹ️  No Friel power zones found in plan_data; power zone analysis will be limited")
 
+        # Fetch details and streams for all activities concurrently up front
+        activity_ids = [activity_summary['id'] for activity_summary in new_activities_to_process]
+        details_by_id = strava_service.get_activity_details_batch(access_token, activity_ids)
+        if not isinstance(details_by_id, dict):
+            return details_by_id  # Redirect response from decorator (token revoked)
+        streams_by_id = strava_service.get_activity_streams_batch(access_token, activity_ids)
+        # The detail endpoint often reports 0-1 laps; the dedicated laps endpoint is more reliable
+        laps_by_id = strava_service.get_activity_laps_batch(access_token, [
+            activity_id for activity_id, activity in details_by_id.items()
+            if isinstance(activity, dict) and len(activity.get('laps') or []) <= 1
+        ])
+        if not isinstance(laps_by_id, dict):
+            return laps_by_id  # Redirect response from decorator (token revoked)
+
         for activity_summary in new_activities_to_process:
-            activity = strava_service.get_activity_detail(access_token, activity_summary['id'])
+            activity = details_by_id.get(activity_summary['id'])
             if not activity:
                 continue
 
@@ -531,7 +545,7 @@ def get_feedback_api():
             activity_laps_from_detail = activity.get('laps') or []
             if len(activity_laps_from_detail) <= 1:
                 # If activity detail has 0 or 1 lap, try dedicated endpoint (might have more)
-                activity_laps = strava_service.get_activity_laps(access_token, activity['id'])
+                activity_laps = laps_by_id.get(activity_summary['id'])
                 if activity_laps and len(activity_laps) > len(activity_laps_from_detail):
                     # Override laps in activity dict with data from dedicated endpoint
                     activity['laps'] = activity_laps
@@ -541,7 +555,7 @@ def get_feedback_api():
             else:
                 print(f"✅ Activity detail has {len(activity_laps_from_detail)} laps - using those")
 
-            streams = strava_service.get_activity_streams(access_token, activity['id'])
+            streams = streams_by_id.get(activity_summary['id'])
 
             # Build zones dict for analysis, including power zones when available
             zones_for_analysis = {}
@@ -646,7 +660,7 @@ def get_feedback_api():
         # Fix for issue #87: VDOT should only be calculated from running activities
         if raw_activities and analyzed_sessions:
             from services.vdot_detection_service import vdot_detection_service
-            from utils.vdot_calculator import VDOTCalculator
+            from utils.vdot_calculator import vdot_calculator
             
             # Use RAW activity for VDOT detection
             raw_activity = raw_activities[0]['activity']
@@ -730,7 +744,7 @@ def get_feedback_api():
                     
                     # Calculate paces from Jack Daniels' tables
                     print(f"\n📏 Calculating training paces from VDOT {new_vdot}...")
-                    calc = VDOTCalculator()
+                    calc = vdot_calculator
                     paces = calc.get_training_paces(new_vdot)
                     
                     print(f"✅ Training paces calculated:")
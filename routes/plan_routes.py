@@ -397,7 +397,7 @@ def generate_plan():
         # Fetch Strava data - check for Response objects (from decorator redirects)
         from flask import Response as FlaskResponse
         
-        strava_zones = strava_service.get_athlete_zones(access_token)
+        strava_zones = strava_service.get_athlete_zones(access_token, athlete_id)
         if isinstance(strava_zones, FlaskResponse):
             return strava_zones  # Redirect response from decorator
         
@@ -1027,7 +1027,7 @@ def generate_maintenance_plan():
         # Fetch Strava data - check for Response objects (from decorator redirects)
         from flask import Response as FlaskResponse
         
-        strava_zones = strava_service.get_athlete_zones(access_token)
+        strava_zones = strava_service.get_athlete_zones(access_token, athlete_id)
         if isinstance(strava_zones, FlaskResponse):
             return strava_zones  # Redirect response from decorator
         
@@ -1,10 +1,42 @@
+import functools
+import logging
+
 from garmin_manager import GarminManager
 from crypto_manager import encrypt, decrypt
 from datetime import date, timedelta
+from statistics import fmean
+
+logger = logging.getLogger(__name__)
+
+
+@functools.lru_cache(maxsize=64)
+def _decrypt_tokenstore(encrypted_tokenstore):
+    """Decrypt a saved Garmin session; cached so repeat fetches (and unusable tokenstores) skip Fernet."""
+    return decrypt(encrypted_tokenstore)
+
 
 class GarminService:
     """Service for Garmin Connect integration"""
     
+    def _login(self, email, encrypted_password, encrypted_tokenstore=None):
+        """
+        Log in to Garmin, preferring the saved tokenstore (2FA users) so the
+        password is only decrypted when there is no usable tokenstore.
+        Returns a logged-in GarminManager or None.
+        """
+        if encrypted_tokenstore:
+            tokenstore = _decrypt_tokenstore(encrypted_tokenstore)
+            if tokenstore:
+                garmin_manager = GarminManager(email, "")  # tokenstore login doesn't use password
+                return garmin_manager if garmin_manager.login(tokenstore=tokenstore) else None
+        
+        password = decrypt(encrypted_password)
+        if not password:
+            logger.warning("Could not decrypt Garmin password. Aborting fetch.")
+            return None
+        garmin_manager = GarminManager(email, password)
+        return garmin_manager if garmin_manager.login() else None
+    
     def authenticate_and_fetch(self, email, encrypted_password, target_date_iso, encrypted_tokenstore=None):
         """
         Authenticate with Garmin and fetch health stats for a specific date.
@@ -12,31 +44,20 @@ class GarminService:
         Returns health stats dict or None on failure.
         """
         try:
-            tokenstore = None
-            if encrypted_tokenstore:
-                tokenstore = decrypt(encrypted_tokenstore)
-            if not tokenstore:
-                password = decrypt(encrypted_password)
-                if not password:
-                    print("Could not decrypt Garmin password. Aborting fetch.")
-                    return None
-            else:
-                password = ""  # tokenstore login doesn't use password
-
-            garmin_manager = GarminManager(email, password)
-            if garmin_manager.login(tokenstore=tokenstore):
+            garmin_manager = self._login(email, encrypted_password, encrypted_tokenstore)
+            if garmin_manager:
                 health_stats = garmin_manager.get_health_stats(target_date_iso)
                 if health_stats:
-                    print(f"--- Successfully fetched Garmin data for {target_date_iso}. ---")
+                    logger.info("--- Successfully fetched Garmin data for %s. ---", target_date_iso)
                     return health_stats
                 else:
-                    print(f"--- Failed to fetch Garmin data, but login was successful. ---")
+                    logger.warning("--- Failed to fetch Garmin data, but login was successful. ---")
                     return None
             else:
-                print("--- Garmin login failed. ---")
+                logger.warning("--- Garmin login failed. ---")
                 return None
         except Exception as e:
-            print(f"Failed to fetch Garmin data: {e}")
+            logger.warning("Failed to fetch Garmin data: %s", e)
             return None
     
     def fetch_yesterday_data(self, user_data):
@@ -63,24 +84,14 @@ class GarminService:
         Prefers tokenstore when present (2FA users). Returns list of daily stats or None on failure.
         """
         try:
-            tokenstore = None
-            if encrypted_tokenstore:
-                tokenstore = decrypt(encrypted_tokenstore)
-            if not tokenstore:
-                password = decrypt(encrypted_password)
-                if not password:
-                    return None
-            else:
-                password = ""
-
-            garmin_manager = GarminManager(email, password)
-            if not garmin_manager.login(tokenstore=tokenstore):
+            garmin_manager = self._login(email, encrypted_password, encrypted_tokenstore)
+            if not garmin_manager:
                 return None
 
             stats_range = garmin_manager.get_health_stats_range(days=days)
             return stats_range if stats_range else None
         except Exception as e:
-            print(f"Error fetching Garmin date range: {e}")
+            logger.warning("Error fetching Garmin date range: %s", e)
             return None
     
     def extract_metrics_timeline(self, stats_range):
@@ -92,13 +103,10 @@ class GarminService:
         if not stats_range:
             return []
         
-        garmin_manager = GarminManager("dummy", "dummy")  # Just for method access
-        
         # Extract metrics, with debug logging only on first day
-        metrics = []
-        for i, day in enumerate(stats_range):
-            debug_mode = (i == 0)  # Only debug the first day
-            metrics.append(garmin_manager.extract_key_metrics(day, debug=debug_mode))
+        extract = GarminManager.extract_key_metrics
+        metrics = [extract(stats_range[0], debug=True)]
+        metrics.extend(extract(day) for day in stats_range[1:])
         
         return metrics
     
@@ -107,8 +115,7 @@ class GarminService:
         if not metrics_timeline:
             return None
         
-        garmin_manager = GarminManager("dummy", "dummy")
-        return garmin_manager.calculate_readiness_score(metrics_timeline)
+        return GarminManager.calculate_readiness_score(metrics_timeline)
     
     def calculate_vo2_max_changes(self, metrics_timeline):
         """
@@ -118,28 +125,29 @@ class GarminService:
         if not metrics_timeline or len(metrics_timeline) < 2:
             return None
         
+        # Pull the VO2 max column once for today plus the 14 days before it
+        return self._vo2_max_changes([day.get('vo2_max') for day in metrics_timeline[-15:]])
+    
+    def _vo2_max_changes(self, vo2_window):
+        """
+        VO2 max changes from the vo2_max column of the last 15 days (oldest to newest).
+        Callers slice the window so no index arithmetic is needed here.
+        """
+        if len(vo2_window) < 2:
+            return None
+        
         # Get today's VO2 max (last item in timeline)
-        today_vo2 = metrics_timeline[-1].get('vo2_max')
+        today_vo2 = vo2_window[-1]
         if today_vo2 is None:
             return None
         
         # Previous day change
-        yesterday_vo2 = metrics_timeline[-2].get('vo2_max') if len(metrics_timeline) >= 2 else None
+        yesterday_vo2 = vo2_window[-2]
         change_1d = (today_vo2 - yesterday_vo2) if yesterday_vo2 is not None else None
         
-        # 14-day average change
-        # Get all VO2 max values from last 14 days (excluding today)
-        vo2_values = []
-        for i in range(max(0, len(metrics_timeline) - 15), len(metrics_timeline) - 1):
-            vo2 = metrics_timeline[i].get('vo2_max')
-            if vo2 is not None:
-                vo2_values.append(vo2)
-        
-        if vo2_values:
-            avg_14d = sum(vo2_values) / len(vo2_values)
-            change_14d_avg = today_vo2 - avg_14d
-        else:
-            change_14d_avg = None
+        # 14-day average change (excluding today)
+        vo2_values = [vo2 for vo2 in vo2_window[:-1] if vo2 is not None]
+        change_14d_avg = (today_vo2 - fmean(vo2_values)) if vo2_values else None
         
         return {
             'vo2_max': today_vo2,
@@ -147,6 +155,20 @@ class GarminService:
             'change_14d_avg': change_14d_avg
         }
     
+    def analyze_range(self, stats_range):
+        """
+        Extract metrics from raw stats once and derive readiness and VO2 max changes from them.
+        Returns dict with 'metrics' (list of metric dicts), 'readiness' and 'vo2_changes'.
+        """
+        metrics = self.extract_metrics_timeline(stats_range)
+        vo2_window = [day['vo2_max'] for day in metrics[-15:]]
+        
+        return {
+            'metrics': metrics,
+            'readiness': self.calculate_readiness(metrics),
+            'vo2_changes': self._vo2_max_changes(vo2_window),
+        }
+    
     def store_credentials(self, email, password, tokenstore=None):
         """Encrypt and prepare credentials for storage. tokenstore (if provided) is used for 2FA users so they don't re-enter OTP on each fetch."""
         creds = {
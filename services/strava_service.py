@@ -1,39 +1,137 @@
+import copy
+import functools
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config import Config
 from utils.decorators import strava_api_call
 
+try:
+    # orjson decodes large payloads (activity streams) several times faster
+    from orjson import loads as _json_loads
+except ImportError:
+    _json_loads = json.loads
+
+logger = logging.getLogger(__name__)
+
+# Cap how many requests batch helpers keep in flight at once across all callers.
+# This only bounds concurrency; it does not pace requests against Strava's
+# per-app rate limit (429s are retried with backoff by the session adapter).
+BATCH_MAX_WORKERS = 8
+_inflight_requests = threading.Semaphore(BATCH_MAX_WORKERS)
+
+# Only the streams zone/FTP analysis reads; distance and altitude were never used
+STREAM_PARAMS = {'keys': 'heartrate,time,watts', 'key_by_type': True}
+
+
+@functools.lru_cache(maxsize=256)
+def _auth_headers(access_token):
+    """Authorization header for a token, built once and reused (requests never mutates it)."""
+    return {'Authorization': f'Bearer {access_token}'}
+
+
+# Zones and stats change rarely, so short-lived copies are reused across requests
+ZONES_CACHE_TTL = 3600
+STATS_CACHE_TTL = 900
+RESPONSE_CACHE_MAX_ENTRIES = 1024
+_response_cache = OrderedDict()  # (endpoint, athlete_id) -> (expires_at, body), oldest first
+_response_cache_lock = threading.Lock()
+
+# One lock per athlete so concurrent requests don't all refresh the same token
+_refresh_locks = {}
+_refresh_locks_guard = threading.Lock()
+
+
+def _refresh_lock_for(athlete_id):
+    """Return the refresh lock for an athlete, creating it on first use."""
+    with _refresh_locks_guard:
+        return _refresh_locks.setdefault(str(athlete_id), threading.Lock())
+
+
 class StravaService:
     """Service for interacting with Strava API"""
     
     def __init__(self):
         self.api_url = Config.STRAVA_API_URL
+        self._api_prefix = f"{self.api_url}/"
+        # Shared session so every call reuses pooled keep-alive connections
+        # instead of paying a fresh TCP + TLS handshake per request.
+        self._session = requests.Session()
+        retries = Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            # Once retries run out, hand back the last 429/5xx response (so callers see
+            # a status code / HTTPError as before) instead of raising RetryError
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=retries)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+    
+    def _get_json(self, access_token, endpoint, params=None):
+        """
+        GET an endpoint and decode the body, raising HTTPError on failure.
+        Has no session/redirect handling, so it is safe to call from worker threads.
+        """
+        response = self._session.get(self._api_prefix + endpoint, headers=_auth_headers(access_token), params=params)
+        response.raise_for_status()
+        return _json_loads(response.content)
     
     @strava_api_call
     def get_api_data(self, access_token, endpoint, params=None):
         """Make a GET request to Strava API"""
-        headers = {'Authorization': f'Bearer {access_token}'}
-        response = requests.get(f"{self.api_url}/{endpoint}", headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
+        return self._get_json(access_token, endpoint, params)
     
     def get_activity_streams(self, access_token, activity_id):
         """Fetch streams for a single activity"""
-        headers = {'Authorization': f'Bearer {access_token}'}
-        params = {'keys': 'heartrate,time,watts,distance,altitude', 'key_by_type': True}
-        response = requests.get(
-            f"{self.api_url}/activities/{activity_id}/streams",
-            headers=headers,
-            params=params
+        response = self._session.get(
+            f"{self._api_prefix}activities/{activity_id}/streams",
+            headers=_auth_headers(access_token),
+            params=STREAM_PARAMS
         )
-        return response.json() if response.status_code == 200 else None
+        return _json_loads(response.content) if response.status_code == 200 else None
+    
+    def _get_api_data_cached(self, access_token, athlete_id, endpoint, ttl):
+        """
+        GET an endpoint, reusing a previous response for the same athlete for up to
+        ttl seconds. Keyed by athlete rather than token so refreshed tokens don't strand
+        entries; callers get their own copy of the body.
+        """
+        key = (endpoint, str(athlete_id))
+        with _response_cache_lock:
+            cached = _response_cache.get(key)
+            if cached and cached[0] <= time.time():
+                del _response_cache[key]
+                cached = None
+        if cached:
+            return copy.deepcopy(cached[1])
+        
+        data = self.get_api_data(access_token, endpoint)
+        # Only cache real payloads, never the decorator's redirect response
+        if isinstance(data, (dict, list)):
+            with _response_cache_lock:
+                _response_cache[key] = (time.time() + ttl, copy.deepcopy(data))
+                _response_cache.move_to_end(key)
+                while len(_response_cache) > RESPONSE_CACHE_MAX_ENTRIES:
+                    _response_cache.popitem(last=False)
+        return data
     
     def get_athlete_stats(self, access_token, athlete_id):
         """Get athlete statistics"""
-        return self.get_api_data(access_token, f"athletes/{athlete_id}/stats")
+        return self._get_api_data_cached(access_token, athlete_id, f"athletes/{athlete_id}/stats", STATS_CACHE_TTL)
     
-    def get_athlete_zones(self, access_token):
+    def get_athlete_zones(self, access_token, athlete_id):
         """Get athlete's heart rate and power zones"""
-        return self.get_api_data(access_token, "athlete/zones")
+        return self._get_api_data_cached(access_token, athlete_id, "athlete/zones", ZONES_CACHE_TTL)
     
     def get_recent_activities(self, access_token, after_timestamp, per_page=100):
         """Get recent activities after a certain timestamp"""
@@ -60,16 +158,91 @@ class StravaService:
         try:
             return self.get_api_data(access_token, f"activities/{activity_id}/laps")
         except Exception as e:
-            print(f"⚠️  Error fetching laps for activity {activity_id}: {e}")
+            logger.warning("⚠️  Error fetching laps for activity %s: %s", activity_id, e)
             return []
     
+    def _fetch_activity_detail(self, access_token, activity_id):
+        """Activity detail for batch workers; raises HTTPError like _get_json."""
+        return self._get_json(access_token, f"activities/{activity_id}")
+    
+    def _fetch_activity_laps(self, access_token, activity_id):
+        """
+        Laps for batch workers. Like get_activity_laps, errors give an empty list,
+        except 401 which is raised so the caller can log the user out.
+        """
+        try:
+            return self._get_json(access_token, f"activities/{activity_id}/laps")
+        except Exception as e:
+            response = getattr(e, 'response', None)
+            if response is not None and response.status_code == 401:
+                raise
+            logger.warning("⚠️  Error fetching laps for activity %s: %s", activity_id, e)
+            return []
+    
+    def _iter_batch(self, fetch, access_token, activity_ids):
+        """
+        Run fetch(access_token, activity_id) for each ID on a thread pool.
+        Yields (activity_id, result) in the given order as each result is ready;
+        activities Strava reports as not found (404) yield None, and any other
+        error is re-raised here on the caller's thread. Stopping early cancels
+        fetches not yet started.
+        """
+        def fetch_one(activity_id):
+            with _inflight_requests:
+                try:
+                    return fetch(access_token, activity_id)
+                except requests.exceptions.HTTPError as e:
+                    if e.response is None or e.response.status_code != 404:
+                        raise
+                    logger.warning("⚠️  Strava activity %s not found, skipping", activity_id)
+                    return None
+
+        activity_ids = list(activity_ids)
+        if not activity_ids:
+            return
+        executor = ThreadPoolExecutor(max_workers=min(BATCH_MAX_WORKERS, len(activity_ids)))
+        try:
+            futures = [executor.submit(fetch_one, activity_id) for activity_id in activity_ids]
+            for activity_id, future in zip(activity_ids, futures):
+                yield activity_id, future.result()
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _fetch_batch(self, fetch, access_token, activity_ids):
+        """
+        Run fetch(access_token, activity_id) for each ID on a thread pool.
+        Returns a dict of activity_id -> result; failed fetches map to None.
+        """
+        return dict(self._iter_batch(fetch, access_token, activity_ids))
+
+    def get_activity_streams_batch(self, access_token, activity_ids):
+        """Fetch streams for several activities concurrently. Returns {activity_id: streams}."""
+        return self._fetch_batch(self.get_activity_streams, access_token, activity_ids)
+
+    def iter_activity_streams(self, access_token, activity_ids):
+        """
+        Fetch streams for several activities concurrently, yielding (activity_id, streams)
+        in the given order so callers can stop at the first one they need.
+        """
+        return self._iter_batch(self.get_activity_streams, access_token, activity_ids)
+
+    @strava_api_call
+    def get_activity_details_batch(self, access_token, activity_ids):
+        """Fetch detail for several activities concurrently. Returns {activity_id: detail}."""
+        return self._fetch_batch(self._fetch_activity_detail, access_token, activity_ids)
+
+    @strava_api_call
+    def get_activity_laps_batch(self, access_token, activity_ids):
+        """Fetch laps for several activities concurrently. Returns {activity_id: laps}."""
+        return self._fetch_batch(self._fetch_activity_laps, access_token, activity_ids)
+
     def deauthorize(self, access_token):
         """Deauthorize the app from Strava"""
         try:
             deauthorize_payload = {'access_token': access_token}
-            requests.post("https://www.strava.com/oauth/deauthorize", data=deauthorize_payload)
+            self._session.post("https://www.strava.com/oauth/deauthorize", data=deauthorize_payload)
         except Exception as e:
-            print(f"Could not deauthorize from Strava: {e}")
+            logger.warning("Could not deauthorize from Strava: %s", e)
     
     def exchange_token(self, auth_code):
         """Exchange authorization code for access token"""
@@ -79,9 +252,9 @@ class StravaService:
             "code": auth_code,
             "grant_type": "authorization_code"
         }
-        response = requests.post("https://www.strava.com/oauth/token", data=token_payload)
+        response = self._session.post("https://www.strava.com/oauth/token", data=token_payload)
         response.raise_for_status()
-        return response.json()
+        return _json_loads(response.content)
     
     def refresh_access_token(self, refresh_token):
         """
@@ -94,12 +267,10 @@ class StravaService:
             dict: New token data with access_token, refresh_token, expires_at
             None: If refresh fails
         """
-        from datetime import datetime
-        
-        print(f"🔄 Refreshing Strava access token...")
+        logger.info("🔄 Refreshing Strava access token...")
         
         try:
-            response = requests.post(
+            response = self._session.post(
                 'https://www.strava.com/oauth/token',
                 data={
                     'client_id': Config.STRAVA_CLIENT_ID,
@@ -111,25 +282,24 @@ class StravaService:
             )
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = _json_loads(response.content)
                 expires_at = token_data.get('expires_at')
                 if expires_at:
                     expires_time = datetime.fromtimestamp(expires_at)
-                    print(f"✅ Token refreshed successfully (expires at {expires_time})")
+                    logger.info("✅ Token refreshed successfully (expires at %s)", expires_time)
                 return token_data
             else:
-                print(f"❌ Token refresh failed: {response.status_code}")
+                logger.warning("❌ Token refresh failed: %s", response.status_code)
                 try:
-                    error_data = response.json()
-                    print(f"   Error details: {error_data}")
+                    error_data = _json_loads(response.content)
+                    logger.warning("   Error details: %s", error_data)
                 except:
-                    print(f"   Response: {response.text[:200]}")
+                    logger.warning("   Response: %s", response.text[:200])
                 return None
                 
         except Exception as e:
-            print(f"❌ Token refresh exception: {e}")
-            import traceback
-            traceback.print_exc()
+            # Full traceback only when debugging; one line is enough while Strava is rate-limiting
+            logger.error("❌ Token refresh exception: %s", e, exc_info=logger.isEnabledFor(logging.DEBUG))
             return None
     
     def ensure_valid_token(self, athlete_id, user_data, data_manager):
@@ -145,17 +315,15 @@ class StravaService:
             str: Valid access_token
             None: If token cannot be refreshed
         """
-        from datetime import datetime
-        
         token = user_data.get('token', {})
         
         # Check if token exists
         if not token or 'access_token' not in token:
-            print(f"❌ No token found for athlete {athlete_id}")
+            logger.warning("❌ No token found for athlete %s", athlete_id)
             return None
         
         expires_at = token.get('expires_at', 0)
-        current_time = datetime.now().timestamp()
+        current_time = time.time()
         time_until_expiry = expires_at - current_time
         
         # Refresh if expired OR expiring within next 5 minutes (300 seconds)
@@ -163,28 +331,35 @@ class StravaService:
             hours_ago = abs(time_until_expiry) / 3600
             
             if time_until_expiry < 0:
-                print(f"⏰ Token EXPIRED {hours_ago:.1f}h ago for athlete {athlete_id} - refreshing...")
+                logger.info("⏰ Token EXPIRED %.1fh ago for athlete %s - refreshing...", hours_ago, athlete_id)
             else:
-                print(f"⏰ Token expiring in {time_until_expiry/60:.0f}m for athlete {athlete_id} - refreshing...")
+                logger.info("⏰ Token expiring in %.0fm for athlete %s - refreshing...", time_until_expiry/60, athlete_id)
             
-            refresh_token = token.get('refresh_token')
-            if not refresh_token:
-                print(f"❌ No refresh_token available for athlete {athlete_id}")
-                return None
-            
-            new_token = self.refresh_access_token(refresh_token)
-            if new_token:
-                user_data['token'] = new_token
-                data_manager.save_user_data(athlete_id, user_data)
-                print(f"💾 Saved refreshed token for athlete {athlete_id}")
-                return new_token['access_token']
-            else:
-                print(f"❌ Token refresh failed for athlete {athlete_id}")
-                return None
+            with _refresh_lock_for(athlete_id):
+                # Another request may have refreshed the token while we waited
+                latest_token = (data_manager.load_user_data(athlete_id) or {}).get('token') or {}
+                if latest_token.get('access_token') and latest_token.get('expires_at', 0) - time.time() >= 300:
+                    user_data['token'] = latest_token
+                    logger.info("✅ Token already refreshed for athlete %s", athlete_id)
+                    return latest_token['access_token']
+                
+                refresh_token = latest_token.get('refresh_token') or token.get('refresh_token')
+                if not refresh_token:
+                    logger.warning("❌ No refresh_token available for athlete %s", athlete_id)
+                    return None
+                
+                new_token = self.refresh_access_token(refresh_token)
+                if new_token:
+                    user_data['token'] = new_token
+                    data_manager.save_user_data(athlete_id, user_data)
+                    logger.info("💾 Saved refreshed token for athlete %s", athlete_id)
+                    return new_token['access_token']
+                else:
+                    logger.warning("❌ Token refresh failed for athlete %s", athlete_id)
+                    return None
         else:
             # Token still valid
-            hours_remaining = time_until_expiry / 3600
-            print(f"✅ Token valid for athlete {athlete_id} ({hours_remaining:.1f}h remaining)")
+            logger.debug("✅ Token valid for athlete %s (%.1fh remaining)", athlete_id, time_until_expiry / 3600)
             return token['access_token']
 
 # Create singleton instance
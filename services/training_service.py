@@ -1,26 +1,118 @@
 import bisect
+import functools
+import heapq
+import logging
 from datetime import datetime, timedelta
+from itertools import islice
 import re
-from utils.formatters import format_seconds, map_race_distance
+from statistics import median_high
+from utils.formatters import extract_week_dates_from_plan, format_seconds, map_race_distance
+
+logger = logging.getLogger(__name__)
+
+METERS_PER_MILE = 1609.34
+
+# Lines that start a week in a markdown plan ("### Week 3 ..." or "**Week 3 ...")
+WEEK_HEADER_RE = re.compile(r'^[^\S\n]*(?:###|\*\*Week)', re.MULTILINE)
+
+# Activity types whose average_watts count towards the FTP estimate
+RIDE_TYPES = frozenset(('Ride', 'VirtualRide'))
+
+# Keys for time-in-zone dicts: 5 HR zones, 7 power zones
+ZONE_LABELS = tuple(f"Zone {i}" for i in range(1, 8))
+
+# Session names/descriptions that suggest time-based intervals ("6x3 min", "8 x 400m repeats", ...),
+# most common first; matched as plain substrings of the lowercased text in a single regex scan
+INTERVAL_KEYWORDS = ('interval', 'repeat', 'x ', '3 min', '4 min', '5 min', '6 min', '8 min',
+                     'x3', 'x4', 'x5', 'x6', 'x8')
+INTERVAL_KEYWORDS_RE = re.compile('|'.join(map(re.escape, INTERVAL_KEYWORDS)))
+
+# Splits a markdown plan into sections, each starting at a "### " heading
+SECTION_SPLIT_RE = re.compile(r'(?=###\s)')
+
+
+def _add_zone_totals(time_in_zones, zone_totals):
+    """
+    Add per-index zone totals into a "Zone N"-keyed dict. Totals are tallied by index;
+    the keyed dict is only the stored/prompt shape (ftp_detection_service reads it by name).
+    """
+    for zone_index, seconds in enumerate(zone_totals):
+        if seconds:
+            time_in_zones[ZONE_LABELS[zone_index]] += seconds
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_plan_date(date_str):
+    """Parse a plan week's YYYY-MM-DD date; cached since the same weeks are re-read on every request."""
+    return datetime.strptime(date_str, '%Y-%m-%d').date()
+
+
+@functools.lru_cache(maxsize=64)
+def _find_week_section(plan_text, week_title):
+    """
+    Return the first '### ' section of the plan that mentions the week title (ignoring
+    '*' and case), or None. Cached since every dashboard load looks up the same week.
+    """
+    title_re = re.compile(re.escape(week_title.replace('*', '').strip()), re.IGNORECASE)
+    for section in SECTION_SPLIT_RE.split(plan_text):
+        if title_re.search(section):
+            return section
+    return None
+
+
+@functools.lru_cache(maxsize=16)
+def _legacy_plan_weeks(plan_text, today):
+    """
+    Week headers parsed from a markdown plan, cached per plan and day (week years are
+    inferred from today). Returned as a tuple; the week dicts must not be modified.
+    """
+    return tuple(extract_week_dates_from_plan(plan_text, today))
+
+
+@functools.lru_cache(maxsize=16)
+def _legacy_plan_last_end_date(plan_text, today):
+    """Latest week end date in a markdown plan (or None), cached like _legacy_plan_weeks."""
+    return max((week['end_date'] for week in _legacy_plan_weeks(plan_text, today)), default=None)
+
+
+def _integrate_zones(time_data, values, zone_mins, totals):
+    """
+    Add the seconds each sample holds (until the next one) to the zone its value falls in.
+    Zone mins ascend, so the zone is the last one whose min <= value (Zone 1 if none).
+    Diff and zone lookup happen in the same pass, so no per-sample lists are built.
+    If the streams differ in length (a sensor dropping out), only the samples both
+    streams cover are counted; zip stops at the shorter one, so nothing is indexed
+    past the end.
+    Streams repeat the same few hundred HR/watt values, so each value's zone is
+    bisected once and memoized for the rest of the stream.
+    """
+    bisect_right = bisect.bisect_right
+    zone_of = {}
+    cached_zone = zone_of.get
+    times = iter(time_data)
+    t_prev = next(times, None)
+    for t_next, value in zip(times, islice(values, max(len(values) - 1, 0))):
+        zone_index = cached_zone(value)
+        if zone_index is None:
+            zone_index = zone_of[value] = max(bisect_right(zone_mins, value) - 1, 0)
+        totals[zone_index] += t_next - t_prev
+        t_prev = t_next
+    return totals
 
 class TrainingService:
     """Service for training plan logic and activity analysis"""
 
-    def _pace_seconds_per_km(self, distance_m, time_s):
+    @staticmethod
+    def _pace_seconds_per_km(distance_m, time_s):
         """Return pace as seconds/km, or None if cannot compute."""
-        try:
-            if not isinstance(distance_m, (int, float)) or distance_m <= 0:
-                return None
-            if not isinstance(time_s, (int, float)) or time_s <= 0:
-                return None
-            km = distance_m / 1000.0
-            if km <= 0:
-                return None
-            return time_s / km
-        except Exception:
+        if not isinstance(distance_m, (int, float)) or distance_m <= 0:
             return None
+        if not isinstance(time_s, (int, float)) or time_s <= 0:
+            return None
+        return time_s * 1000.0 / distance_m
 
-    def _format_distance(self, distance_m: float, prefer_miles: bool = False):
+    @staticmethod
+    def _format_distance(distance_m: float, prefer_miles: bool = False):
         """
         Format distance consistently as km or miles with decimal for partial units.
         
@@ -35,19 +127,30 @@ class TrainingService:
             return None
         
         if prefer_miles:
-            miles = distance_m / 1609.34
+            miles = distance_m / METERS_PER_MILE
             return f"{miles:.1f} miles"
         else:
             km = distance_m / 1000.0
             return f"{km:.1f} km"
     
-    def _calculate_std(self, values):
-        """Calculate standard deviation of a list of numbers"""
-        if not values or len(values) < 2:
-            return 0
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / len(values)
-        return variance ** 0.5
+    @staticmethod
+    def _calculate_std(values):
+        """Calculate (population) standard deviation of numbers in one pass (Welford)"""
+        n = 0
+        mean = 0.0
+        m2 = 0.0
+        for x in values:
+            n += 1
+            delta = x - mean
+            mean += delta / n
+            m2 += delta * (x - mean)
+        return (m2 / n) ** 0.5 if n > 1 else 0
+    
+    @staticmethod
+    def _mentions_intervals(activity):
+        """True if the activity name/description suggests intervals (one regex scan over both)."""
+        text = (activity.get('name') or '') + ' ' + (activity.get('description') or '')
+        return INTERVAL_KEYWORDS_RE.search(text.lower()) is not None
     
     def _detect_unit_preference(self, segments_summary: dict):
         """
@@ -66,7 +169,7 @@ class TrainingService:
         
         avg_distance = sum(sample_distances) / len(sample_distances)
         # If average is closer to 1 mile (1609m) than 1km (1000m), prefer miles
-        return abs(avg_distance - 1609.34) < abs(avg_distance - 1000.0)
+        return abs(avg_distance - METERS_PER_MILE) < abs(avg_distance - 1000.0)
 
     def _summarize_segments(self, segments, kind: str, max_items: int = 60):
         """
@@ -78,31 +181,38 @@ class TrainingService:
         if not isinstance(segments, list) or not segments:
             return {"kind": kind, "count": 0, "truncated": False, "segments": []}
 
+        number = (int, float)
         segs = []
-        for s in segments[:max_items]:
-            distance_m = s.get("distance")
-            moving_time_s = s.get("moving_time")
-            elapsed_time_s = s.get("elapsed_time")
-            avg_speed_mps = s.get("average_speed")
-            avg_hr = s.get("average_heartrate")
-            pace_zone = s.get("pace_zone")
+        for s in islice(segments, max_items):
+            get = s.get
+            distance_m = get("distance")
+            moving_time_s = get("moving_time")
+            elapsed_time_s = get("elapsed_time")
+            avg_speed_mps = get("average_speed")
+            avg_hr = get("average_heartrate")
+
+            # Type-check each value once and reuse the result below
+            distance_is_num = isinstance(distance_m, number)
+            has_distance = distance_is_num and distance_m > 0
+            elapsed_is_num = isinstance(elapsed_time_s, number)
+            moving_is_num = isinstance(moving_time_s, number)
 
             # Prefer elapsed_time when present; fallback to moving_time.
-            time_s = elapsed_time_s if isinstance(elapsed_time_s, (int, float)) and elapsed_time_s > 0 else moving_time_s
-            pace_s_per_km = self._pace_seconds_per_km(distance_m, time_s)
+            time_s = elapsed_time_s if elapsed_is_num and elapsed_time_s > 0 else moving_time_s
+            pace_s_per_km = self._pace_seconds_per_km(distance_m, time_s) if has_distance else None
 
             segs.append({
-                "index": s.get("split") or s.get("lap_index") or s.get("lap") or s.get("index"),
-                "name": s.get("name"),
-                "distance_m": round(distance_m, 2) if isinstance(distance_m, (int, float)) else None,
-                "distance_km": round(distance_m / 1000.0, 2) if isinstance(distance_m, (int, float)) and distance_m > 0 else None,
-                "distance_miles": round(distance_m / 1609.34, 2) if isinstance(distance_m, (int, float)) and distance_m > 0 else None,
-                "elapsed_time_s": int(elapsed_time_s) if isinstance(elapsed_time_s, (int, float)) else None,
-                "moving_time_s": int(moving_time_s) if isinstance(moving_time_s, (int, float)) else None,
-                "average_speed_mps": round(avg_speed_mps, 3) if isinstance(avg_speed_mps, (int, float)) else None,
-                "pace_s_per_km": round(pace_s_per_km, 1) if isinstance(pace_s_per_km, (int, float)) else None,
-                "average_heartrate": round(avg_hr, 1) if isinstance(avg_hr, (int, float)) else avg_hr,
-                "pace_zone": pace_zone,
+                "index": get("split") or get("lap_index") or get("lap") or get("index"),
+                "name": get("name"),
+                "distance_m": round(distance_m, 2) if distance_is_num else None,
+                "distance_km": round(distance_m / 1000.0, 2) if has_distance else None,
+                "distance_miles": round(distance_m / METERS_PER_MILE, 2) if has_distance else None,
+                "elapsed_time_s": int(elapsed_time_s) if elapsed_is_num else None,
+                "moving_time_s": int(moving_time_s) if moving_is_num else None,
+                "average_speed_mps": round(avg_speed_mps, 3) if isinstance(avg_speed_mps, number) else None,
+                "pace_s_per_km": round(pace_s_per_km, 1) if pace_s_per_km is not None else None,
+                "average_heartrate": round(avg_hr, 1) if isinstance(avg_hr, number) else avg_hr,
+                "pace_zone": get("pace_zone"),
             })
 
         return {
@@ -112,6 +222,47 @@ class TrainingService:
             "segments": segs
         }
 
+    @staticmethod
+    def _segment_times(segments):
+        """Elapsed (or moving) time for each summarized segment that has one."""
+        return [t for t in (seg.get("elapsed_time_s") or seg.get("moving_time_s") for seg in segments) if t]
+
+    def _compare_laps_to_splits(self, laps_segments, splits_segments):
+        """
+        Compare lap segments to auto-split segments to spot interval sessions.
+
+        Laps that differ from splits (count, time consistency or distance) suggest manual lap
+        presses / workout intervals; laps that match splits suggest auto-laps on a steady run.
+        Returns (is_interval_session, detection_method).
+        """
+        # Check if lap distances/times differ from split distances/times
+        if len(laps_segments) != len(splits_segments):
+            return True, "laps_vs_splits_count_mismatch"
+
+        # Compare both distances AND times - time-based intervals will have consistent lap times
+        # but varying distances, while splits will have consistent distances but varying times
+        lap_times = self._segment_times(laps_segments[:10])
+        split_times = self._segment_times(splits_segments[:10])
+
+        # Check if lap times are more consistent than split times (suggests time-based intervals)
+        if len(lap_times) >= 3 and len(split_times) >= 3:
+            lap_time_std = self._calculate_std(lap_times)
+            split_time_std = self._calculate_std(split_times)
+            # If lap times are much more consistent (lower std dev), likely time-based intervals
+            if lap_time_std > 0 and split_time_std > 0 and lap_time_std < split_time_std * 0.7:
+                return True, "laps_vs_splits_time_consistency"
+
+        # Also check distances - if they differ significantly, likely intervals
+        for lap, split in zip(laps_segments[:10], splits_segments[:10]):
+            lap_dist = lap.get("distance_m")
+            split_dist = split.get("distance_m")
+            if lap_dist and split_dist:
+                # If distance differs by more than 10%, likely an interval
+                if abs(lap_dist - split_dist) / max(lap_dist, split_dist) > 0.10:
+                    return True, "laps_vs_splits_distance_mismatch"
+
+        return False, "none"
+
     def _detect_interval_pattern(self, lap_summary: dict):
         """
         Best-effort interval detection from lap-like segments.
@@ -120,52 +271,47 @@ class TrainingService:
         (different watch/Strava configs produce different lap structures).
         """
         segments = (lap_summary or {}).get("segments") or []
-        speeds = [s.get("average_speed_mps") for s in segments if isinstance(s.get("average_speed_mps"), (int, float))]
+        speeds = [spd for spd in (s.get("average_speed_mps") for s in segments) if isinstance(spd, (int, float))]
         if len(speeds) < 6:
             return {"has_intervals": False, "reason": "insufficient_lap_speed_data"}
 
-        speeds_sorted = sorted(speeds)
-        median = speeds_sorted[len(speeds_sorted) // 2]
+        median = median_high(speeds)
         if not median or median <= 0:
             return {"has_intervals": False, "reason": "invalid_median_speed"}
 
         work_threshold = median * 1.12
         recovery_threshold = median * 0.90
 
-        labels = []
+        # Tally work/recovery laps and the alternations between them in one pass;
+        # steady laps (and laps without usable data) don't break a work/recovery run
+        work_count = 0
+        recovery_count = 0
+        transitions = 0
+        last = None
         for s in segments:
             spd = s.get("average_speed_mps")
             pace_zone = s.get("pace_zone")
 
             # Prefer Strava's pace_zone when available (more robust than speed thresholds).
-            if isinstance(pace_zone, int):
-                if pace_zone >= 4:
-                    labels.append("work")
-                    continue
-                if pace_zone <= 2:
-                    labels.append("recovery")
-                    continue
-
-            if not isinstance(spd, (int, float)):
+            if isinstance(pace_zone, int) and (pace_zone >= 4 or pace_zone <= 2):
+                lab = "work" if pace_zone >= 4 else "recovery"
+            elif not isinstance(spd, (int, float)):
                 continue
-            if spd >= work_threshold:
-                labels.append("work")
+            elif spd >= work_threshold:
+                lab = "work"
             elif spd <= recovery_threshold:
-                labels.append("recovery")
+                lab = "recovery"
             else:
-                labels.append("steady")
-
-        transitions = 0
-        last = None
-        for lab in labels:
-            if lab not in ("work", "recovery"):
                 continue
+
+            if lab == "work":
+                work_count += 1
+            else:
+                recovery_count += 1
             if last and lab != last:
                 transitions += 1
             last = lab
 
-        work_count = labels.count("work")
-        recovery_count = labels.count("recovery")
         has_intervals = work_count >= 3 and recovery_count >= 2 and transitions >= 3
 
         return {
@@ -180,28 +326,34 @@ class TrainingService:
     
     def calculate_friel_hr_zones(self, lthr):
         """Calculate heart rate zones using Joe Friel's method"""
+        # LTHR is whole bpm, so integer percentages give exact thresholds (no float rounding)
+        z1_max = lthr * 85 // 100
         return {
             "zones": [
-                {"min": 0, "max": int(lthr * 0.85)},
-                {"min": int(lthr * 0.85), "max": int(lthr * 0.89)},
-                {"min": int(lthr * 0.90), "max": int(lthr * 0.94)},
-                {"min": int(lthr * 0.95), "max": int(lthr * 1.0)},
-                {"min": int(lthr * 1.0), "max": -1}
+                {"min": 0, "max": z1_max},
+                {"min": z1_max, "max": lthr * 89 // 100},
+                {"min": lthr * 90 // 100, "max": lthr * 94 // 100},
+                {"min": lthr * 95 // 100, "max": lthr},
+                {"min": lthr, "max": -1}
             ],
             "calculation_method": f"Joe Friel (LTHR: {lthr} bpm)"
         }
     
     def calculate_friel_power_zones(self, ftp):
         """Calculate power zones using Joe Friel's method"""
+        # FTP is whole watts; each shared boundary is computed once
+        z1_max = ftp * 55 // 100
+        z5_max = ftp * 120 // 100
+        z6_max = ftp * 150 // 100
         return {
             "zones": [
-                {"min": 0, "max": int(ftp * 0.55)},
-                {"min": int(ftp * 0.55), "max": int(ftp * 0.74)},
-                {"min": int(ftp * 0.75), "max": int(ftp * 0.89)},
-                {"min": int(ftp * 0.90), "max": int(ftp * 1.04)},
-                {"min": int(ftp * 1.05), "max": int(ftp * 1.20)},
-                {"min": int(ftp * 1.20), "max": int(ftp * 1.50)},
-                {"min": int(ftp * 1.50), "max": -1}
+                {"min": 0, "max": z1_max},
+                {"min": z1_max, "max": ftp * 74 // 100},
+                {"min": ftp * 75 // 100, "max": ftp * 89 // 100},
+                {"min": ftp * 90 // 100, "max": ftp * 104 // 100},
+                {"min": ftp * 105 // 100, "max": z5_max},
+                {"min": z5_max, "max": z6_max},
+                {"min": z6_max, "max": -1}
             ],
             "calculation_method": f"Joe Friel (Estimated FTP: {ftp} W)"
         }
@@ -223,8 +375,8 @@ class TrainingService:
             "average_speed_kph": round(activity.get('average_speed', 0) * 3.6, 2),
             "average_heartrate": activity.get('average_heartrate'),
             "max_heartrate": activity.get('max_heartrate'),
-            "time_in_hr_zones": {f"Zone {i+1}": 0 for i in range(5)},
-            "time_in_power_zones": {f"Zone {i+1}": 0 for i in range(7)},
+            "time_in_hr_zones": dict.fromkeys(ZONE_LABELS[:5], 0),
+            "time_in_power_zones": dict.fromkeys(ZONE_LABELS, 0),
             "private_note": activity.get('private_note', '')
         }
 
@@ -251,113 +403,62 @@ class TrainingService:
         
         # Debug logging for interval sessions
         if len(laps) > 0 or len(laps_from_detail) > 0 or len(splits_metric) > 0 or len(splits_standard) > 0:
-            print(f"📊 Activity {activity.get('id')} segment data:")
-            print(f"   Laps from detail: {len(laps_from_detail)}")
-            print(f"   Laps from endpoint: {len(laps_from_endpoint)}")
-            print(f"   Laps to use: {len(laps)}")
-            print(f"   Splits metric: {len(splits_metric)}")
-            print(f"   Splits standard: {len(splits_standard)}")
+            logger.debug("📊 Activity %s segment data:", activity.get('id'))
+            logger.debug("   Laps from detail: %s", len(laps_from_detail))
+            logger.debug("   Laps from endpoint: %s", len(laps_from_endpoint))
+            logger.debug("   Laps to use: %s", len(laps))
+            logger.debug("   Splits metric: %s", len(splits_metric))
+            logger.debug("   Splits standard: %s", len(splits_standard))
 
-        analyzed["splits_metric_summary"] = self._summarize_segments(splits_metric, kind="splits_metric")
-        analyzed["splits_standard_summary"] = self._summarize_segments(splits_standard, kind="splits_standard")
-        analyzed["laps_summary"] = self._summarize_segments(laps, kind="laps")
+        splits_metric_summary = self._summarize_segments(splits_metric, kind="splits_metric")
+        splits_standard_summary = self._summarize_segments(splits_standard, kind="splits_standard")
+        laps_summary = self._summarize_segments(laps, kind="laps")
+        analyzed["splits_metric_summary"] = splits_metric_summary
+        analyzed["splits_standard_summary"] = splits_standard_summary
+        analyzed["laps_summary"] = laps_summary
         
         # Additional debug for laps_summary
-        if analyzed["laps_summary"].get("count", 0) > 0:
-            print(f"   ✅ Created laps_summary with {analyzed['laps_summary']['count']} segments")
+        if laps_summary["count"] > 0:
+            logger.debug("   ✅ Created laps_summary with %s segments", laps_summary['count'])
         
         # Safer interval detection: compare laps vs splits
         # If laps differ from splits, it's likely an interval session (manual lap button presses)
         # If they're the same, it's likely a standard run (auto-lap creates both)
-        has_laps = analyzed["laps_summary"].get("count", 0) > 0
-        has_splits_metric = analyzed["splits_metric_summary"].get("count", 0) > 0
-        has_splits_standard = analyzed["splits_standard_summary"].get("count", 0) > 0
+        has_laps = laps_summary["count"] > 0
+        has_splits_metric = splits_metric_summary["count"] > 0
+        has_splits_standard = splits_standard_summary["count"] > 0
         
         is_interval_session = False
         detection_method = "none"
         
         if has_laps:
             # Compare laps to splits to detect intervals
-            laps_segments = analyzed["laps_summary"].get("segments", [])
+            laps_segments = laps_summary["segments"]
             
-            if has_splits_metric:
-                splits_segments = analyzed["splits_metric_summary"].get("segments", [])
-                # Check if lap distances/times differ from split distances/times
-                if len(laps_segments) != len(splits_segments):
-                    is_interval_session = True
-                    detection_method = "laps_vs_splits_count_mismatch"
-                else:
-                    # Compare both distances AND times - time-based intervals will have consistent lap times
-                    # but varying distances, while splits will have consistent distances but varying times
-                    lap_times = [lap.get("elapsed_time_s") or lap.get("moving_time_s") for lap in laps_segments[:10] if lap.get("elapsed_time_s") or lap.get("moving_time_s")]
-                    split_times = [split.get("elapsed_time_s") or split.get("moving_time_s") for split in splits_segments[:10] if split.get("elapsed_time_s") or split.get("moving_time_s")]
-                    
-                    # Check if lap times are more consistent than split times (suggests time-based intervals)
-                    if len(lap_times) >= 3 and len(split_times) >= 3:
-                        lap_time_std = self._calculate_std(lap_times)
-                        split_time_std = self._calculate_std(split_times)
-                        # If lap times are much more consistent (lower std dev), likely time-based intervals
-                        if lap_time_std > 0 and split_time_std > 0 and lap_time_std < split_time_std * 0.7:
-                            is_interval_session = True
-                            detection_method = "laps_vs_splits_time_consistency"
-                    
-                    # Also check distances - if they differ significantly, likely intervals
-                    if not is_interval_session:
-                        for lap, split in zip(laps_segments[:10], splits_segments[:10]):
-                            lap_dist = lap.get("distance_m")
-                            split_dist = split.get("distance_m")
-                            if lap_dist and split_dist:
-                                # If distance differs by more than 10%, likely an interval
-                                if abs(lap_dist - split_dist) / max(lap_dist, split_dist) > 0.10:
-                                    is_interval_session = True
-                                    detection_method = "laps_vs_splits_distance_mismatch"
-                                    break
-            elif has_splits_standard:
-                splits_segments = analyzed["splits_standard_summary"].get("segments", [])
-                if len(laps_segments) != len(splits_segments):
-                    is_interval_session = True
-                    detection_method = "laps_vs_splits_count_mismatch"
-                else:
-                    # Same logic for standard splits
-                    lap_times = [lap.get("elapsed_time_s") or lap.get("moving_time_s") for lap in laps_segments[:10] if lap.get("elapsed_time_s") or lap.get("moving_time_s")]
-                    split_times = [split.get("elapsed_time_s") or split.get("moving_time_s") for split in splits_segments[:10] if split.get("elapsed_time_s") or split.get("moving_time_s")]
-                    
-                    if len(lap_times) >= 3 and len(split_times) >= 3:
-                        lap_time_std = self._calculate_std(lap_times)
-                        split_time_std = self._calculate_std(split_times)
-                        if lap_time_std > 0 and split_time_std > 0 and lap_time_std < split_time_std * 0.7:
-                            is_interval_session = True
-                            detection_method = "laps_vs_splits_time_consistency"
-                    
-                    if not is_interval_session:
-                        for lap, split in zip(laps_segments[:10], splits_segments[:10]):
-                            lap_dist = lap.get("distance_m")
-                            split_dist = split.get("distance_m")
-                            if lap_dist and split_dist:
-                                if abs(lap_dist - split_dist) / max(lap_dist, split_dist) > 0.10:
-                                    is_interval_session = True
-                                    detection_method = "laps_vs_splits_distance_mismatch"
-                                    break
+            if has_splits_metric or has_splits_standard:
+                splits_summary = splits_metric_summary if has_splits_metric else splits_standard_summary
+                splits_segments = splits_summary["segments"]
+                is_interval_session, detection_method = self._compare_laps_to_splits(laps_segments, splits_segments)
             else:
                 # No splits available, but we have laps - check if lap times suggest intervals
                 # Time-based intervals (e.g., 3min on/off) will have consistent lap times
-                lap_times = [lap.get("elapsed_time_s") or lap.get("moving_time_s") for lap in laps_segments if lap.get("elapsed_time_s") or lap.get("moving_time_s")]
+                lap_times = self._segment_times(laps_segments)
                 if len(lap_times) >= 6:
                     # Check if lap times are relatively consistent (within 20% of median)
                     # This suggests time-based intervals rather than distance-based
-                    median_time = sorted(lap_times)[len(lap_times) // 2]
+                    median_time = median_high(lap_times)
                     consistent_count = sum(1 for t in lap_times if abs(t - median_time) / median_time < 0.20)
                     if consistent_count >= len(lap_times) * 0.6:  # 60% of laps within 20% of median
                         is_interval_session = True
                         detection_method = "laps_time_consistency"
                     else:
                         # Fallback to pattern detection
-                        intervals_detected = self._detect_interval_pattern(analyzed["laps_summary"])
+                        intervals_detected = self._detect_interval_pattern(laps_summary)
                         is_interval_session = intervals_detected.get("has_intervals", False)
                         detection_method = "pattern_detection_fallback"
                 else:
                     # Not enough data, use pattern detection
-                    intervals_detected = self._detect_interval_pattern(analyzed["laps_summary"])
+                    intervals_detected = self._detect_interval_pattern(laps_summary)
                     is_interval_session = intervals_detected.get("has_intervals", False)
                     detection_method = "pattern_detection_fallback"
         
@@ -366,18 +467,12 @@ class TrainingService:
             "detection_method": detection_method
         }
         
-        # Additional check: if activity name/description suggests intervals and we have laps, prefer laps
-        activity_name = activity.get('name') or ''
-        activity_description = activity.get('description') or ''
-        activity_name_lower = (activity_name + ' ' + activity_description).lower()
-        mentions_intervals = any(keyword in activity_name_lower for keyword in ['interval', 'repeat', 'x ', 'x3', 'x4', 'x5', 'x6', 'x8', '3 min', '4 min', '5 min', '6 min', '8 min'])
-        
         # Add guidance for AI: which summary to prioritize and unit preference
         if is_interval_session and has_laps:
             # For interval sessions, prioritize laps (manual lap button presses or workout-defined intervals)
             analyzed["preferred_segment_summary"] = "laps_summary"
             analyzed["preferred_segment_reason"] = "Interval session detected - laps differ from splits (manual lap button presses)"
-        elif mentions_intervals and has_laps:
+        elif has_laps and self._mentions_intervals(activity):
             # Session description mentions intervals and we have laps - strongly prefer laps
             analyzed["preferred_segment_summary"] = "laps_summary"
             analyzed["preferred_segment_reason"] = "Session description mentions intervals - using laps (time-based intervals don't align with distance splits)"
@@ -401,11 +496,11 @@ class TrainingService:
         
         # Detect unit preference (km vs miles) from available splits/laps
         if has_splits_metric:
-            prefer_miles = self._detect_unit_preference(analyzed["splits_metric_summary"])
+            prefer_miles = self._detect_unit_preference(splits_metric_summary)
         elif has_splits_standard:
             prefer_miles = True  # Standard splits are always miles
         elif has_laps:
-            prefer_miles = self._detect_unit_preference(analyzed["laps_summary"])
+            prefer_miles = self._detect_unit_preference(laps_summary)
         else:
             prefer_miles = False  # Default to km
         
@@ -422,75 +517,79 @@ class TrainingService:
             return analyzed
         
         # Analyze heart rate zones
-        if 'heartrate' in streams:
+        hr_zones = zones.get('heart_rate', {}).get('zones', [])
+        if 'heartrate' in streams and hr_zones:
             hr_data = streams['heartrate']['data']
-            hr_zones = zones.get('heart_rate', {}).get('zones', [])
-            zone_mins = [z['min'] for z in hr_zones]
+            zone_mins = tuple(z['min'] for z in hr_zones)
             
-            for i in range(1, len(hr_data)):
-                duration = time_data[i] - time_data[i-1]
-                hr = hr_data[i-1]
-                zone_index = bisect.bisect_right(zone_mins, hr) - 1
-                analyzed["time_in_hr_zones"][f"Zone {zone_index + 1}"] += duration
+            # Tally per zone index, then write into the keyed dict once
+            zone_totals = _integrate_zones(time_data, hr_data, zone_mins, [0] * len(zone_mins))
+            _add_zone_totals(analyzed["time_in_hr_zones"], zone_totals)
         
         # Analyze power zones
         if 'watts' in streams:
             power_data = streams['watts']['data']
             power_zones = zones.get('power', {}).get('zones', [])
+            power_mins = tuple(z['min'] for z in power_zones)
             
-            for i in range(1, len(power_data)):
-                duration = time_data[i] - time_data[i-1]
-                power = power_data[i-1]
-                
-                current_zone_index = 0
-                for zone_index, zone_data in enumerate(power_zones):
-                    if power >= zone_data['min']:
-                        current_zone_index = zone_index
-                    else:
-                        break
-                
-                analyzed["time_in_power_zones"][f"Zone {current_zone_index + 1}"] += duration
+            zone_totals = _integrate_zones(time_data, power_data, power_mins, [0] * max(len(power_mins), 1))
+            _add_zone_totals(analyzed["time_in_power_zones"], zone_totals)
         
         return analyzed
     
-    def find_valid_race_for_vdot(self, activities, access_token, friel_hr_zones, strava_service):
-        """Find a valid race in the last 4 weeks for VDOT calculation"""
-        four_weeks_ago = datetime.now() - timedelta(weeks=4)
-        
-        for activity in activities:
-            activity_date_str = activity['start_date_local'].split('T')[0]
-            activity_date = datetime.strptime(activity_date_str, '%Y-%m-%d')
-            
-            if activity.get('workout_type') == 1 and activity_date > four_weeks_ago:
-                streams = strava_service.get_activity_streams(access_token, activity['id'])
-                if streams and 'heartrate' in streams:
-                    race_analysis = self.analyze_activity(
-                        activity,
-                        streams,
-                        {"heart_rate": friel_hr_zones}
-                    )
-                    
-                    total_time = sum(race_analysis['time_in_hr_zones'].values())
-                    high_intensity_time = (
-                        race_analysis['time_in_hr_zones']["Zone 4"] +
-                        race_analysis['time_in_hr_zones']["Zone 5"]
-                    )
-                    
-                    if total_time > 0 and (high_intensity_time / total_time) > 0.5:
-                        return {
-                            "status": "VDOT Ready",
-                            "race_basis": f"{activity['name']} ({activity_date_str})"
-                        }
+    def find_valid_race_for_vdot(self, activities, access_token, friel_hr_zones, strava_service, today=None):
+        """
+        Find a valid race in the last 4 weeks for VDOT calculation.
+        Pass today (a date) to evaluate several plan/zone checks against the same day.
+        """
+        now = datetime.now() if today is None else datetime.combine(today, datetime.min.time())
+        four_weeks_ago = now - timedelta(weeks=4)
+        
+        # Newest first (ISO timestamps sort chronologically) so we can stop at the 4-week cutoff
+        races = []
+        for activity in sorted(activities, key=lambda a: a['start_date_local'], reverse=True):
+            activity_date_str = activity['start_date_local'][:10]
+            if datetime.fromisoformat(activity_date_str) <= four_weeks_ago:
+                break
+            if activity.get('workout_type') == 1:
+                races.append((activity, activity_date_str))
+        
+        # Fetch candidate race streams concurrently and check them newest first;
+        # returning early cancels the fetches for older races that haven't started
+        race_streams = strava_service.iter_activity_streams(
+            access_token, [activity['id'] for activity, _ in races]
+        )
+        # Only HR time-in-zone matters here, so tally it straight into a per-index list
+        # instead of running the full analyze_activity (segments, keyed zone dicts) per race
+        zone_mins = tuple(z['min'] for z in (friel_hr_zones or {}).get('zones', []))
+        for (activity, activity_date_str), (_, streams) in zip(races, race_streams):
+            if zone_mins and streams and 'heartrate' in streams:
+                hr_totals = _integrate_zones(
+                    streams.get('time', {}).get('data', []),
+                    streams['heartrate']['data'],
+                    zone_mins,
+                    [0] * len(zone_mins)
+                )
+                
+                total_time = sum(hr_totals)
+                high_intensity_time = hr_totals[3] + hr_totals[4]
+                
+                if total_time > 0 and (high_intensity_time / total_time) > 0.5:
+                    return {
+                        "status": "VDOT Ready",
+                        "race_basis": f"{activity['name']} ({activity_date_str})"
+                    }
         
         return {
             "status": "HR Training Recommended",
             "reason": "No recent, high-intensity race found."
         }
     
-    def estimate_zones_from_activities(self, activities):
+    def estimate_zones_from_activities(self, activities, today=None):
         """
         Estimate LTHR and FTP from recent activity data.
         Returns dict with 'lthr' and 'ftp' keys (or None if can't estimate).
+        Pass today (a date) to share one reference day across a request.
         """
         estimates = {'lthr': None, 'ftp': None}
         
@@ -498,78 +597,85 @@ class TrainingService:
             return estimates
         
         # Look for recent races or hard efforts (last 8 weeks)
-        eight_weeks_ago = datetime.now() - timedelta(weeks=8)
+        now = datetime.now() if today is None else datetime.combine(today, datetime.min.time())
+        eight_weeks_ago = now - timedelta(weeks=8)
         
-        max_hr_values = []
-        max_power_values = []
+        hr_count = 0
+        top_max_hrs = []  # min-heap of the 5 highest max HR values
         avg_power_values = []
+        heappush = heapq.heappush
+        heappushpop = heapq.heappushpop
         
         for activity in activities:
             try:
-                activity_date = datetime.strptime(
-                    activity['start_date_local'].split('T')[0],
-                    '%Y-%m-%d'
-                )
+                activity_date = datetime.fromisoformat(activity['start_date_local'][:10])
                 
                 if activity_date < eight_weeks_ago:
                     continue
                 
+                get = activity.get
+                
                 # Collect heart rate data
-                if activity.get('max_heartrate'):
-                    max_hr_values.append(activity['max_heartrate'])
+                max_heartrate = get('max_heartrate')
+                if max_heartrate:
+                    hr_count += 1
+                    if len(top_max_hrs) < 5:
+                        heappush(top_max_hrs, max_heartrate)
+                    else:
+                        heappushpop(top_max_hrs, max_heartrate)
                 
                 # Collect power data (for cycling activities)
-                if activity.get('type') in ['Ride', 'VirtualRide']:
-                    if activity.get('average_watts') and activity.get('average_watts') > 0:
-                        # Only use activities longer than 20 minutes for FTP estimation
-                        if activity.get('moving_time', 0) >= 1200:  # 20 minutes in seconds
-                            avg_power_values.append(activity['average_watts'])
-                    
-                    if activity.get('max_watts'):
-                        max_power_values.append(activity['max_watts'])
+                if get('type') in RIDE_TYPES:
+                    average_watts = get('average_watts')
+                    # Only use activities longer than 20 minutes for FTP estimation
+                    if average_watts and average_watts > 0 and get('moving_time', 0) >= 1200:
+                        avg_power_values.append(average_watts)
                 
             except (ValueError, KeyError):
                 continue
         
         # Estimate LTHR from max HR (LTHR is typically 88% of max HR for trained athletes)
         # Use 88% as a reasonable estimate
-        if max_hr_values:
-            max_hr = max(max_hr_values)
+        if hr_count:
+            max_hr = max(top_max_hrs)
             estimates['lthr'] = int(max_hr * 0.88)
-            print(f"--- Found {len(max_hr_values)} activities with HR data ---")
-            print(f"--- Max HR found: {max_hr} bpm, Estimated LTHR: {estimates['lthr']} bpm ---")
+            logger.debug("--- Found %s activities with HR data ---", hr_count)
+            logger.debug("--- Max HR found: %s bpm, Estimated LTHR: %s bpm ---", max_hr, estimates['lthr'])
             # Show top 5 max HR values for debugging
-            top_hrs = sorted(max_hr_values, reverse=True)[:5]
-            print(f"--- Top 5 max HR values: {top_hrs} ---")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("--- Top 5 max HR values: %s ---", sorted(top_max_hrs, reverse=True))
         
         # Estimate FTP from average power in longer efforts
         # Use the 90th percentile of average power values as a conservative FTP estimate
         if avg_power_values:
-            avg_power_values.sort()
-            # Take the top 10% of average power values
-            top_efforts = avg_power_values[int(len(avg_power_values) * 0.9):]
+            # Take the top 10% of average power values (selection, no full sort)
+            top_count = len(avg_power_values) - int(len(avg_power_values) * 0.9)
+            top_efforts = heapq.nlargest(top_count, avg_power_values)
             if top_efforts:
-                estimates['ftp'] = int(sum(top_efforts) / len(top_efforts))
+                # Sum smallest-first, matching the old sorted-slice sum exactly
+                estimates['ftp'] = int(sum(reversed(top_efforts)) / len(top_efforts))
         
         return estimates
     
-    def get_current_week_plan(self, plan_text, plan_structure=None):
+    def get_current_week_plan(self, plan_text, plan_structure=None, today=None):
         """
         Finds and returns the markdown for the current or closest upcoming week's plan.
+        today defaults to the current date; pass it to share one day across calls.
         """
-        today = datetime.now().date()
+        if today is None:
+            today = datetime.now().date()
 
         # METHOD 1: Use structured JSON data if available
         if plan_structure and 'weeks' in plan_structure:
-            print("--- Finding current week using structured JSON. ---")
+            logger.debug("--- Finding current week using structured JSON. ---")
             found_week_title = None
             closest_upcoming_title = None
             min_future_delta = timedelta(days=999)
 
             for week in plan_structure.get('weeks', []):
                 try:
-                    start_date = datetime.strptime(week['start_date'], '%Y-%m-%d').date()
-                    end_date = datetime.strptime(week['end_date'], '%Y-%m-%d').date()
+                    start_date = _parse_plan_date(week['start_date'])
+                    end_date = _parse_plan_date(week['end_date'])
 
                     if start_date <= today <= end_date:
                         found_week_title = week['title']
@@ -585,17 +691,13 @@ class TrainingService:
             week_title_to_find = found_week_title or closest_upcoming_title
             
             if week_title_to_find:
-                clean_title = re.escape(week_title_to_find.replace('*','').strip())
-                sections = re.split(r'(?=###\s)', plan_text, flags=re.IGNORECASE)
-                for section in sections:
-                    if re.search(clean_title, section, re.IGNORECASE):
-                        return section
+                section = _find_week_section(plan_text, week_title_to_find)
+                if section is not None:
+                    return section
 
         # METHOD 2: Fallback to regex parsing
-        print("--- No structured JSON found. Falling back to legacy regex parsing. ---")
-        from utils.formatters import extract_week_dates_from_plan
-        
-        all_weeks = extract_week_dates_from_plan(plan_text)
+        logger.debug("--- No structured JSON found. Falling back to legacy regex parsing. ---")
+        all_weeks = _legacy_plan_weeks(plan_text, today)
         
         current_week = None
         closest_upcoming_week = None
@@ -614,25 +716,24 @@ class TrainingService:
         week_to_display = current_week or closest_upcoming_week
         
         if week_to_display:
-            lines = plan_text.splitlines()
-            start_index = week_to_display['index']
-            end_index = len(lines)
-            
-            for i in range(start_index + 1, len(lines)):
-                if lines[i].strip().startswith('###') or lines[i].strip().startswith('**Week'):
-                    end_index = i
-                    break
+            # The week runs from its header line to the next header line (or the end of the plan)
+            start = week_to_display['offset']
+            header_end = plan_text.find('\n', start)
+            next_header = WEEK_HEADER_RE.search(plan_text, header_end + 1) if header_end != -1 else None
+            end = next_header.start() if next_header else len(plan_text)
             
-            return "\n".join(lines[start_index:end_index])
+            return "\n".join(plan_text[start:end].splitlines())
 
         return "Could not determine the current or upcoming training week from your plan."
     
-    def is_plan_finished(self, plan_text, plan_structure=None):
+    def is_plan_finished(self, plan_text, plan_structure=None, today=None):
         """
         Check if the training plan has finished (today is past the last week's end_date).
         Returns tuple: (is_finished: bool, last_week_end_date: date or None)
+        today defaults to the current date; pass it to share one day across calls.
         """
-        today = datetime.now().date()
+        if today is None:
+            today = datetime.now().date()
         
         # METHOD 1: Use structured JSON data if available
         if plan_structure and 'weeks' in plan_structure:
@@ -640,29 +741,32 @@ class TrainingService:
             if not weeks:
                 return (False, None)
             
-            # Find the last week's end date
+            # Find the last week's end date. Zero-padded YYYY-MM-DD strings sort chronologically,
+            # so when every week has one, take the max string and parse only that.
             last_end_date = None
-            for week in weeks:
+            end_date_strs = [week.get('end_date') for week in weeks]
+            if all(isinstance(d, str) and len(d) == 10 for d in end_date_strs):
                 try:
-                    end_date = datetime.strptime(week['end_date'], '%Y-%m-%d').date()
-                    if last_end_date is None or end_date > last_end_date:
-                        last_end_date = end_date
-                except (ValueError, KeyError):
-                    continue
+                    last_end_date = _parse_plan_date(max(end_date_strs))
+                except ValueError:
+                    pass
+            if last_end_date is None:
+                for week in weeks:
+                    try:
+                        end_date = _parse_plan_date(week['end_date'])
+                        if last_end_date is None or end_date > last_end_date:
+                            last_end_date = end_date
+                    except (ValueError, KeyError):
+                        continue
             
             if last_end_date:
                 return (today > last_end_date, last_end_date)
         
         # METHOD 2: Fallback to regex parsing
-        from utils.formatters import extract_week_dates_from_plan
-        
-        all_weeks = extract_week_dates_from_plan(plan_text)
-        if not all_weeks:
+        last_end_date = _legacy_plan_last_end_date(plan_text, today)
+        if last_end_date is None:
             return (False, None)
         
-        # Find the latest end date
-        last_end_date = max(week['end_date'] for week in all_weeks)
-        
         return (today > last_end_date, last_end_date)
 
 # Create singleton instance
@@ -4,9 +4,104 @@ VDOT Detection and Validation Service
 Determines when an activity qualifies for VDOT calculation.
 Only races and all-out time trials should update VDOT values.
 """
+import logging
+import re
+from bisect import bisect_left
+from functools import lru_cache
 from typing import Optional, Dict, Any, Tuple
 from utils.vdot_calculator import get_vdot_from_race
 
+logger = logging.getLogger(__name__)
+
+# Race keywords matched anywhere in the activity name, in one scan.
+# 'half marathon', '10k race' and '5k race' are already covered by 'marathon' and 'race'.
+RACE_NAME_RE = re.compile(r'race|parkrun|marathon', re.IGNORECASE)
+
+# All-out intensity rules per distance category. Each takes
+# (distance_category, time_in_zones, total_time) and returns (qualifies, reason),
+# working out only the zone percentages it needs.
+def _short_race_rule(distance_category, time_in_zones, total_time):
+    """Short races (1500m-3K): Should be mostly Z5"""
+    z5_pct = (time_in_zones.get('Z5', 0) / total_time) * 100
+    if z5_pct >= 60:
+        return True, f"60%+ in Z5 ({z5_pct:.0f}%)"
+    return False, f"Only {z5_pct:.0f}% in Z5, need 60%+ for {distance_category}"
+
+
+def _medium_race_rule(distance_category, time_in_zones, total_time):
+    """Medium races (5K-10K): High Z5 or combined Z4+Z5"""
+    z5_pct = (time_in_zones.get('Z5', 0) / total_time) * 100
+    if z5_pct >= 50:
+        return True, f"50%+ in Z5 ({z5_pct:.0f}%)"
+    z4_z5_pct = (time_in_zones.get('Z4', 0) / total_time) * 100 + z5_pct
+    if z4_z5_pct >= 80:
+        return True, f"80%+ in Z4+Z5 ({z4_z5_pct:.0f}%)"
+    return False, f"Only {z5_pct:.0f}% Z5 and {z4_z5_pct:.0f}% Z4+Z5, need 50% Z5 or 80% Z4+Z5"
+
+
+def _long_race_rule(distance_category, time_in_zones, total_time):
+    """Long races (15K-HM): Mostly Z4+Z5"""
+    z4_z5_pct = (time_in_zones.get('Z4', 0) / total_time) * 100 + (time_in_zones.get('Z5', 0) / total_time) * 100
+    if z4_z5_pct >= 70:
+        return True, f"70%+ in Z4+Z5 ({z4_z5_pct:.0f}%)"
+    return False, f"Only {z4_z5_pct:.0f}% in Z4+Z5, need 70%+ for {distance_category}"
+
+
+def _marathon_rule(distance_category, time_in_zones, total_time):
+    """Marathon: Mostly Z3+Z4"""
+    z3_z4_pct = (time_in_zones.get('Z3', 0) / total_time) * 100 + (time_in_zones.get('Z4', 0) / total_time) * 100
+    if z3_z4_pct >= 80:
+        return True, f"80%+ in Z3+Z4 ({z3_z4_pct:.0f}%)"
+    return False, f"Only {z3_z4_pct:.0f}% in Z3+Z4, need 80%+ for marathon"
+
+
+INTENSITY_RULES = {
+    '1500M': _short_race_rule,
+    'MILE': _short_race_rule,
+    '3K': _short_race_rule,
+    '5K': _medium_race_rule,
+    '10K': _medium_race_rule,
+    '15K': _long_race_rule,
+    'HM': _long_race_rule,
+    'MARATHON': _marathon_rule,
+}
+
+
+@lru_cache(maxsize=2048)
+def _name_is_race(name):
+    """Whether an activity name contains a race keyword; cached since the same names recur across imports."""
+    return RACE_NAME_RE.search(name) is not None
+
+
+def _build_distance_lookup(ranges):
+    """
+    Flatten (possibly overlapping) category -> (min, max) ranges into a sorted
+    partition for bisect lookup. Returns (bounds, at_bound, between) where
+    at_bound[i] is the category for exactly bounds[i] and between[i] the
+    category strictly between bounds[i-1] and bounds[i]. Each slot keeps the
+    first matching range in dict order, as a linear scan would.
+    """
+    def first_match(distance):
+        for category, (min_dist, max_dist) in ranges.items():
+            if min_dist <= distance <= max_dist:
+                return category
+        return None
+    
+    bounds = tuple(sorted({d for pair in ranges.values() for d in pair}))
+    at_bound = tuple(first_match(d) for d in bounds)
+    between = (None,) + tuple(first_match((lo + hi) / 2) for lo, hi in zip(bounds, bounds[1:])) + (None,)
+    return bounds, at_bound, between
+
+
+@lru_cache(maxsize=2048)
+def _distance_category(distance_meters, lenient):
+    """First standard distance whose (strict or lenient) range contains distance_meters, or None."""
+    bounds, at_bound, between = VDOTDetectionService._DISTANCE_LOOKUPS[lenient]
+    i = bisect_left(bounds, distance_meters)
+    if i < len(bounds) and bounds[i] == distance_meters:
+        return at_bound[i]
+    return between[i]
+
 
 class VDOTDetectionService:
     """
@@ -45,6 +140,12 @@ class VDOTDetectionService:
         'MARATHON': (37800, 46750)  # ±10% of 42250m
     }
     
+    # Bisect partitions of the ranges above, built once; indexed by the `lenient` flag
+    _DISTANCE_LOOKUPS = (
+        _build_distance_lookup(VALID_DISTANCES),
+        _build_distance_lookup(LENIENT_DISTANCES),
+    )
+    
     def __init__(self):
         pass
     
@@ -66,14 +167,8 @@ class VDOTDetectionService:
             return True
         
         # Also check if "race" is in the name
-        name = activity.get('name', '').lower()
-        race_keywords = ['race', 'parkrun', 'marathon', 'half marathon', '10k race', '5k race']
-        
-        for keyword in race_keywords:
-            if keyword in name:
-                return True
-        
-        return False
+        name = activity.get('name')
+        return bool(name) and _name_is_race(name)
     
     def get_distance_category(self, distance_meters: float, lenient: bool = False) -> Optional[str]:
         """
@@ -86,18 +181,9 @@ class VDOTDetectionService:
         Returns:
             Distance category (e.g., '5K', 'HM') or None if not a standard distance
         """
-        if lenient:
-            # Use lenient ranges for races/hard efforts (GPS can be off, courses can be long)
-            for category, (min_dist, max_dist) in self.LENIENT_DISTANCES.items():
-                if min_dist <= distance_meters <= max_dist:
-                    return category
-        else:
-            # Strict range matching
-            for category, (min_dist, max_dist) in self.VALID_DISTANCES.items():
-                if min_dist <= distance_meters <= max_dist:
-                    return category
-        
-        return None
+        # Lenient ranges for races/hard efforts (GPS can be off, courses can be long), else strict.
+        # Ranges overlap (1500M/MILE), so the first matching range wins.
+        return _distance_category(distance_meters, bool(lenient))
     
     def analyze_effort_intensity(self, time_in_zones: Dict[str, int], 
                                  total_time: int,
@@ -122,46 +208,9 @@ class VDOTDetectionService:
         if total_time == 0:
             return False, "No moving time"
         
-        # Calculate zone percentages
-        z1_pct = (time_in_zones.get('Z1', 0) / total_time) * 100
-        z2_pct = (time_in_zones.get('Z2', 0) / total_time) * 100
-        z3_pct = (time_in_zones.get('Z3', 0) / total_time) * 100
-        z4_pct = (time_in_zones.get('Z4', 0) / total_time) * 100
-        z5_pct = (time_in_zones.get('Z5', 0) / total_time) * 100
-        
-        z4_z5_pct = z4_pct + z5_pct
-        z3_z4_pct = z3_pct + z4_pct
-        z1_z2_pct = z1_pct + z2_pct
-        
-        # Short races (1500m-3K): Should be mostly Z5
-        if distance_category in ['1500M', 'MILE', '3K']:
-            if z5_pct >= 60:
-                return True, f"60%+ in Z5 ({z5_pct:.0f}%)"
-            else:
-                return False, f"Only {z5_pct:.0f}% in Z5, need 60%+ for {distance_category}"
-        
-        # Medium races (5K-10K): High Z5 or combined Z4+Z5
-        elif distance_category in ['5K', '10K']:
-            if z5_pct >= 50:
-                return True, f"50%+ in Z5 ({z5_pct:.0f}%)"
-            elif z4_z5_pct >= 80:
-                return True, f"80%+ in Z4+Z5 ({z4_z5_pct:.0f}%)"
-            else:
-                return False, f"Only {z5_pct:.0f}% Z5 and {z4_z5_pct:.0f}% Z4+Z5, need 50% Z5 or 80% Z4+Z5"
-        
-        # Long races (15K-HM): Mostly Z4+Z5
-        elif distance_category in ['15K', 'HM']:
-            if z4_z5_pct >= 70:
-                return True, f"70%+ in Z4+Z5 ({z4_z5_pct:.0f}%)"
-            else:
-                return False, f"Only {z4_z5_pct:.0f}% in Z4+Z5, need 70%+ for {distance_category}"
-        
-        # Marathon: Mostly Z3+Z4
-        elif distance_category == 'MARATHON':
-            if z3_z4_pct >= 80:
-                return True, f"80%+ in Z3+Z4 ({z3_z4_pct:.0f}%)"
-            else:
-                return False, f"Only {z3_z4_pct:.0f}% in Z3+Z4, need 80%+ for marathon"
+        rule = INTENSITY_RULES.get(distance_category)
+        if rule:
+            return rule(distance_category, time_in_zones, total_time)
         
         return False, f"Unknown distance category: {distance_category}"
     
@@ -190,23 +239,35 @@ class VDOTDetectionService:
         return easy_pct > 20
     
     def should_calculate_vdot(self, activity: Dict[str, Any], 
-                             time_in_zones: Dict[str, int]) -> Tuple[bool, str, Optional[str]]:
+                             time_in_zones: Dict[str, int],
+                             is_race: Optional[bool] = None) -> Tuple[bool, str, Optional[str]]:
         """
         Determine if an activity qualifies for VDOT calculation.
         
         Args:
             activity: Strava activity dict
             time_in_zones: Dict of zone -> seconds
+            is_race: is_race_marked(activity), if the caller already has it
             
         Returns:
             Tuple of (should_calculate, reason, distance_category)
         """
         # Check 1: Is it marked as a race?
-        is_race = self.is_race_marked(activity)
+        if is_race is None:
+            is_race = self.is_race_marked(activity)
         
-        # Check 2: Is it an appropriate distance?
         distance_meters = activity.get('distance', 0)
+        moving_time = activity.get('moving_time', 0)
+        elapsed_time = activity.get('elapsed_time', 0)
         
+        # Z4+Z5 share of moving time; both intensity shortcuts below only apply to non-races
+        z4_z5_pct = None
+        if not is_race and moving_time and moving_time > 0:
+            z4_pct = (time_in_zones.get('Z4', 0) / moving_time) * 100
+            z5_pct = (time_in_zones.get('Z5', 0) / moving_time) * 100
+            z4_z5_pct = z4_pct + z5_pct
+        
+        # Check 2: Is it an appropriate distance?
         # Try strict matching first
         distance_category = self.get_distance_category(distance_meters, lenient=False)
         
@@ -221,23 +282,16 @@ class VDOTDetectionService:
             if is_race:
                 should_use_lenient = True
                 lenient_reason = "marked as race"
-            else:
-                # Check intensity to see if it's a hard effort
-                total_time = activity.get('moving_time', 0)
-                if total_time > 0:
-                    z4_pct = (time_in_zones.get('Z4', 0) / total_time) * 100
-                    z5_pct = (time_in_zones.get('Z5', 0) / total_time) * 100
-                    z4_z5_pct = z4_pct + z5_pct
-                    
-                    # If >50% in Z4+Z5, likely a hard effort - use lenient distance matching
-                    if z4_z5_pct >= 50:
-                        should_use_lenient = True
-                        lenient_reason = f"hard effort ({z4_z5_pct:.0f}% Z4+Z5)"
+            elif z4_z5_pct is not None:
+                # If >50% in Z4+Z5, likely a hard effort - use lenient distance matching
+                if z4_z5_pct >= 50:
+                    should_use_lenient = True
+                    lenient_reason = f"hard effort ({z4_z5_pct:.0f}% Z4+Z5)"
             
             if should_use_lenient:
                 distance_category = self.get_distance_category(distance_meters, lenient=True)
                 if distance_category:
-                    print(f"   ℹ️  Using lenient distance matching ({lenient_reason}): {distance_meters}m matches {distance_category}")
+                    logger.debug("   ℹ️  Using lenient distance matching (%s): %sm matches %s", lenient_reason, distance_meters, distance_category)
         
         if not distance_category:
             return False, f"Distance {distance_meters}m not a standard race distance", None
@@ -248,9 +302,6 @@ class VDOTDetectionService:
             return False, "No heart rate data available", None
         
         # Check 4: Is it a continuous effort (not intervals)?
-        moving_time = activity.get('moving_time', 0)
-        elapsed_time = activity.get('elapsed_time', 0)
-        
         # If elapsed >> moving, lots of stops (not a race/TT)
         if elapsed_time > 0 and (moving_time / elapsed_time) < 0.9:
             return False, "Too many stops (not continuous effort)", None
@@ -259,11 +310,7 @@ class VDOTDetectionService:
         # 1. It's marked as a race, OR
         # 2. It has high Z4+Z5 time (>50%), indicating an all-out effort
         #    (high Z1 could be HRM issues at start, not actual recovery)
-        if not is_race and moving_time > 0:
-            z4_pct = (time_in_zones.get('Z4', 0) / moving_time) * 100
-            z5_pct = (time_in_zones.get('Z5', 0) / moving_time) * 100
-            z4_z5_pct = z4_pct + z5_pct
-            
+        if z4_z5_pct is not None:
             # Only check for recovery intervals if Z4+Z5 is <50%
             # If Z4+Z5 is high, it's clearly an all-out effort regardless of Z1 time
             if z4_z5_pct < 50:
@@ -311,14 +358,34 @@ class VDOTDetectionService:
                 'intensity_reason': str
             }
         """
+        return self.evaluate_activity(activity, time_in_zones)[0]
+    
+    def evaluate_activity(self, activity: Dict[str, Any], 
+                          time_in_zones: Dict[str, int]) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Run the VDOT qualification checks once and return both outcomes.
+        
+        Batch callers that log why an activity was rejected use this instead of
+        calculate_vdot_from_activity followed by should_calculate_vdot.
+        
+        Args:
+            activity: Strava activity dict
+            time_in_zones: Dict of zone -> seconds
+        
+        Returns:
+            Tuple of (result, reason) where result is the calculate_vdot_from_activity
+            dict (or None) and reason is the should_calculate_vdot reason
+        """
+        is_race = self.is_race_marked(activity)
         should_calc, reason, distance_category = self.should_calculate_vdot(
             activity, 
-            time_in_zones
+            time_in_zones,
+            is_race
         )
         
         if not should_calc:
-            print(f"   ℹ️  Not using for VDOT: {reason}")
-            return None
+            logger.debug("   ℹ️  Not using for VDOT: %s", reason)
+            return None, reason
         
         # Calculate VDOT using CSV lookup
         distance_meters = activity.get('distance', 0)
@@ -327,10 +394,8 @@ class VDOTDetectionService:
         vdot = get_vdot_from_race(distance_category, time_seconds)
         
         if not vdot:
-            print(f"   ⚠️  Failed to calculate VDOT for {distance_category}")
-            return None
-        
-        is_race = self.is_race_marked(activity)
+            logger.warning("   ⚠️  Failed to calculate VDOT for %s", distance_category)
+            return None, reason
         
         result = {
             'vdot': vdot,
@@ -343,9 +408,9 @@ class VDOTDetectionService:
             'intensity_reason': reason
         }
         
-        print(f"   ✅ VDOT {vdot} from {distance_category} - {reason}")
+        logger.info("   ✅ VDOT %s from %s - %s", vdot, distance_category, reason)
         
-        return result
+        return result, reason
 
 
 # Create singleton instance
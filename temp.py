@@ -2,18 +2,37 @@ import boto3
 import json
 from decimal import Decimal
 
+def convert_decimal(value):
+    whole = int(value)
+    return whole if whole == value else float(value)
+
 def convert_decimals(obj):
-    if isinstance(obj, dict):
-        return {k: convert_decimals(v) for k, v in obj.items()}
-    elif isinstance(obj, list):
-        return [convert_decimals(i) for i in obj]
-    elif isinstance(obj, Decimal):
-        return int(obj) if obj % 1 == 0 else float(obj)
+    # Converts Decimals in place, walking nested dicts/lists with a stack rather than recursion.
+    # boto3 deserializes to exactly dict/list/Decimal, so exact type checks are enough.
+    if type(obj) is Decimal:
+        return convert_decimal(obj)
+    stack = [obj]
+    while stack:
+        node = stack.pop()
+        kind = type(node)
+        if kind is dict:
+            items = node.items()
+        elif kind is list:
+            items = enumerate(node)
+        else:
+            continue
+        for key, value in items:
+            kind = type(value)
+            if kind is Decimal:
+                node[key] = convert_decimal(value)
+            elif kind is dict or kind is list:
+                stack.append(value)
     return obj
 
 dynamodb = boto3.resource('dynamodb', region_name='eu-west-1')
 table = dynamodb.Table('staging-kaizencoach-users')
-response = table.get_item(Key={'athlete_id': '196048876'})
+# Only plan_data is inspected below, so don't fetch (or convert) the rest of the item
+response = table.get_item(Key={'athlete_id': '196048876'}, ProjectionExpression='plan_data')
 user_data = convert_decimals(response['Item'])
 
 print('Has plan_data:', 'plan_data' in user_data)
@@ -4,14 +4,28 @@ Test script to verify TrainingPlan.from_dict() fix
 
 Run this to confirm sessions are properly loaded and the input dict is not mutated.
 """
-import json
 from models.training_plan import TrainingPlan
 
-# Load your plan
-with open('users_data.json') as f:
-    data = json.load(f)
+try:
+    # orjson parses a full users dump several times faster
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+# Load your plan, keeping only its subtree so the rest of the dump can be freed
+with open('users_data.json', 'rb') as f:
+    plan_dict = json_loads(f.read())['2117356']['plan_v2']
+
+
+def count_sessions(weeks):
+    """Total sessions across week dicts (weeks without sessions count as 0)."""
+    total = 0
+    for week in weeks:
+        sessions = week.get('sessions')
+        if sessions:
+            total += len(sessions)
+    return total
 
-plan_dict = data['2117356']['plan_v2']
 
 print("="*60)
 print("TESTING TrainingPlan.from_dict() FIX")
@@ -19,7 +33,7 @@ print("="*60)
 
 # Count sessions in original dict
 original_weeks = len(plan_dict['weeks'])
-original_sessions = sum(len(w.get('sessions', [])) for w in plan_dict['weeks'])
+original_sessions = count_sessions(plan_dict['weeks'])
 print(f"\n📊 BEFORE from_dict():")
 print(f"   Dict has {original_weeks} weeks")
 print(f"   Dict has {original_sessions} sessions")
@@ -37,7 +51,7 @@ print(f"   Object has {obj_sessions} sessions")
 
 # Check if original dict was mutated
 after_weeks = len(plan_dict['weeks'])
-after_sessions = sum(len(w.get('sessions', [])) for w in plan_dict['weeks'])
+after_sessions = count_sessions(plan_dict['weeks'])
 print(f"\n📊 Original dict status:")
 print(f"   Dict still has {after_weeks} weeks")
 print(f"   Dict still has {after_sessions} sessions")
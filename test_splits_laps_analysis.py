@@ -8,6 +8,7 @@ Usage:
 
 import importlib.util
 import os
+import sys
 
 
 def _load_training_service():
@@ -15,13 +16,17 @@ def _load_training_service():
     Load `services/training_service.py` without importing the `services` package.
 
     The `services` package `__init__.py` imports other modules (e.g. Strava/AWS deps) which
-    aren't needed for this unit-level regression test.
+    aren't needed for this unit-level regression test. The module is registered in
+    `sys.modules`, so repeated calls reuse it instead of executing the file again.
     """
-    here = os.path.dirname(os.path.abspath(__file__))
-    svc_path = os.path.join(here, "services", "training_service.py")
-    spec = importlib.util.spec_from_file_location("training_service_mod", svc_path)
-    mod = importlib.util.module_from_spec(spec)
-    spec.loader.exec_module(mod)  # type: ignore[union-attr]
+    mod = sys.modules.get("training_service_mod")
+    if mod is None:
+        here = os.path.dirname(os.path.abspath(__file__))
+        svc_path = os.path.join(here, "services", "training_service.py")
+        spec = importlib.util.spec_from_file_location("training_service_mod", svc_path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)  # type: ignore[union-attr]
+        sys.modules["training_service_mod"] = mod
     return mod.training_service
 
 
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Regression test (script-style) for StravaService when Strava keeps rate-limiting.
+
+Points the service at a local server that answers every request with 429, so the
+session's retries run out. Streams should map to None (as a single call always did)
+and detail fetches should raise HTTPError, not RetryError.
+
+Usage:
+    python test_strava_rate_limit.py
+"""
+
+import importlib.util
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import requests
+
+
+class _AlwaysRateLimited(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(429)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def _load_strava_service():
+    """Load `services/strava_service.py` without importing the whole `services` package."""
+    here = os.path.dirname(os.path.abspath(__file__))
+    svc_path = os.path.join(here, "services", "strava_service.py")
+    spec = importlib.util.spec_from_file_location("strava_service_mod", svc_path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)  # type: ignore[union-attr]
+    return mod.StravaService()
+
+
+def main():
+    server = HTTPServer(("127.0.0.1", 0), _AlwaysRateLimited)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        strava_service = _load_strava_service()
+        strava_service._api_prefix = f"http://127.0.0.1:{server.server_port}/"
+
+        streams_by_id = strava_service.get_activity_streams_batch("token", [1, 2])
+        assert streams_by_id == {1: None, 2: None}, f"Expected no streams, got: {streams_by_id}"
+
+        try:
+            strava_service.get_activity_details_batch("token", [1])
+        except requests.exceptions.HTTPError as e:
+            assert e.response is not None and e.response.status_code == 429
+        else:
+            raise AssertionError("Expected HTTPError for rate-limited activity detail")
+    finally:
+        server.shutdown()
+
+    print("✅ PASS: rate-limited streams map to None and details raise HTTPError")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,8 +5,24 @@ Test script to verify VDOT calculator works with your CSV.
 Usage:
     python test_vdot_calculator.py
 """
+import functools
+import os
+
 from utils.vdot_calculator import VDOTCalculator, get_vdot_from_race, validate_ai_vdot
 
+# Where to look for the VDOT CSV, in order of preference
+CSV_PATHS = (
+    'data/vdot_table.csv',
+    'VDOT_tables_-_VDOT_tables.csv',
+    '../VDOT_tables_-_VDOT_tables.csv'
+)
+
+
+@functools.lru_cache(maxsize=1)
+def _resolve_csv_path():
+    """First CSV path that exists (or None); resolved once per run."""
+    return next((path for path in CSV_PATHS if os.path.exists(path)), None)
+
 
 def test_with_your_csv():
     """Test VDOT calculator with your actual CSV file"""
@@ -16,24 +32,13 @@ def test_with_your_csv():
     print("="*70)
     
     # Initialize calculator with your CSV (try both paths)
-    import os
-    csv_paths = [
-        'data/vdot_table.csv',
-        'VDOT_tables_-_VDOT_tables.csv',
-        '../VDOT_tables_-_VDOT_tables.csv'
-    ]
-    
-    csv_path = None
-    for path in csv_paths:
-        if os.path.exists(path):
-            csv_path = path
-            print(f"✅ Found CSV at: {path}\n")
-            break
-    
-    if not csv_path:
+    csv_path = _resolve_csv_path()
+    if csv_path:
+        print(f"✅ Found CSV at: {csv_path}\n")
+    else:
         print("❌ Could not find VDOT CSV file!")
         print("\nSearched:")
-        for path in csv_paths:
+        for path in CSV_PATHS:
             print(f"   - {path}")
         print("\nPlease copy VDOT_tables_-_VDOT_tables.csv to data/vdot_table.csv")
         return
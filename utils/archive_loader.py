@@ -5,9 +5,23 @@ Archive is used for historical reference, AI context (via training_history
 summaries), and admin rollback/restore. All archive entries are stored in S3;
 DynamoDB only holds archive_s3_key when archive has been offloaded.
 """
+import functools
 import os
 
 
+@functools.lru_cache(maxsize=1)
+def _archive_s3_manager():
+    """
+    Return s3_manager if archives can be read/written in S3 (S3 available and
+    FLASK_ENV is production), else None. Resolved on first use, like
+    Config; an import failure raises and is retried on the next call.
+    """
+    from s3_manager import s3_manager, S3_AVAILABLE
+    if not S3_AVAILABLE or os.getenv('FLASK_ENV') != 'production':
+        return None
+    return s3_manager
+
+
 def get_user_archive(athlete_id, user_data):
     """
     Return the full plan archive for an athlete (newest first).
@@ -24,7 +38,7 @@ def get_user_archive(athlete_id, user_data):
         list: Archive entries (each has 'plan', optional 'plan_v2', 'completed_date', etc.).
     """
     in_memory = user_data.get('archive')
-    if in_memory and isinstance(in_memory, list) and len(in_memory) > 0:
+    if in_memory and isinstance(in_memory, list):
         return in_memory
 
     s3_key = user_data.get('archive_s3_key')
@@ -32,8 +46,8 @@ def get_user_archive(athlete_id, user_data):
         return []
 
     try:
-        from s3_manager import s3_manager, S3_AVAILABLE
-        if not S3_AVAILABLE or os.getenv('FLASK_ENV') != 'production':
+        s3_manager = _archive_s3_manager()
+        if s3_manager is None:
             return []
         data = s3_manager.load_large_data(s3_key)
         return data if isinstance(data, list) else []
@@ -55,8 +69,8 @@ def save_user_archive_to_s3(athlete_id, archive_list):
         str: S3 key if saved, None otherwise.
     """
     try:
-        from s3_manager import s3_manager, S3_AVAILABLE
-        if not S3_AVAILABLE or os.getenv('FLASK_ENV') != 'production':
+        s3_manager = _archive_s3_manager()
+        if s3_manager is None:
             return None
         key = s3_manager.save_large_data(athlete_id, 'plan_archive', archive_list or [])
         return key
@@ -1,6 +1,6 @@
 import functools
 import requests
-from flask import session, redirect, flash
+from flask import session, redirect, flash, has_request_context
 
 def login_required(f):
     """
@@ -19,17 +19,20 @@ def strava_api_call(f):
     """
     Decorator to handle Strava API calls and token expiration.
     If a 401 Unauthorized is received, it clears the session and redirects to login.
+    Outside a request (webhook timers, worker threads) there is no session, so the
+    error is re-raised for the caller to handle.
     """
     @functools.wraps(f)
     def decorated_function(*args, **kwargs):
         try:
             return f(*args, **kwargs)
         except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 401:
+            response = e.response
+            if response is not None and response.status_code == 401 and has_request_context():
                 # Unauthorized - likely token expired
                 session.clear()
                 flash("Your session has expired. Please log in again.")
                 return redirect('/')
-            # For other HTTP errors, re-raise the exception
-            raise e
+            # For other HTTP errors (or ones raised without a response), re-raise the exception
+            raise
     return decorated_function
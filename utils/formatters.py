@@ -1,6 +1,32 @@
-from datetime import datetime, timedelta
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+import calendar
 import re
 
+# Plan week headers ("### Week 3: ..." / "**Week 3 ...") and the "Month DDth - Month DDth" range in them
+WEEK_HEADER_LINE_RE = re.compile(r'\s*(?:###|\*\*Week)')
+DATE_RANGE_RE = re.compile(r'(\w+\s\d{1,2})[a-z]{2}\s*-\s*(\w+\s\d{1,2})[a-z]{2}')
+
+# Lowercased month name -> number, full names ("%B") then abbreviations ("%b"), tried in that order
+MONTH_NUMBERS = (
+    {name.lower(): number for number, name in enumerate(calendar.month_name) if name},
+    {name.lower(): number for number, name in enumerate(calendar.month_abbr) if name},
+)
+
+def _parse_month_day(month_day, year, month_numbers):
+    """Parse 'October 6' into a date in `year`; raises ValueError like strptime would."""
+    month_str, day_str = month_day.split()
+    month = month_numbers.get(month_str.lower())
+    if month is None:
+        raise ValueError(f"unknown month: {month_str}")
+    return date(year, month, int(day_str))
+
+# "{h}h {m}m {s}s" templates with the empty parts left out, indexed by (hours>0, minutes>0, secs>0) as bits
+DURATION_FORMATS = tuple(
+    " ".join(part for bit, part in ((4, "{0}h"), (2, "{1}m"), (1, "{2}s")) if mask & bit)
+    for mask in range(8)
+)
+
 def format_seconds(seconds):
     """Format seconds into a human-readable string (e.g., '1h 30m 45s')"""
     seconds = int(seconds)
@@ -10,26 +36,18 @@ def format_seconds(seconds):
     hours, remainder = divmod(seconds, 3600)
     minutes, secs = divmod(remainder, 60)
     
-    parts = []
-    if hours > 0:
-        parts.append(f"{hours}h")
-    if minutes > 0:
-        parts.append(f"{minutes}m")
-    if secs > 0:
-        parts.append(f"{secs}s")
-    
-    return " ".join(parts)
+    return DURATION_FORMATS[(hours > 0) << 2 | (minutes > 0) << 1 | (secs > 0)].format(hours, minutes, secs)
+
+# Inclusive (min, max) meters of each standard race, flattened in ascending order, and their names
+RACE_DISTANCE_BOUNDS = (4875, 5125, 9750, 10250, 20570, 21625, 41140, 43250)
+RACE_DISTANCE_NAMES = ("5k Race", "10k Race", "Half Marathon Race", "Marathon Race")
 
 def map_race_distance(distance_meters):
     """Map a distance in meters to a standard race name"""
-    if 4875 <= distance_meters <= 5125:
-        return "5k Race"
-    if 9750 <= distance_meters <= 10250:
-        return "10k Race"
-    if 20570 <= distance_meters <= 21625:
-        return "Half Marathon Race"
-    if 41140 <= distance_meters <= 43250:
-        return "Marathon Race"
+    # An odd insertion point falls inside a range; an even one only counts if it hits a min exactly
+    i = bisect_left(RACE_DISTANCE_BOUNDS, distance_meters)
+    if i % 2 or (i < len(RACE_DISTANCE_BOUNDS) and RACE_DISTANCE_BOUNDS[i] == distance_meters):
+        return RACE_DISTANCE_NAMES[i // 2]
     return "Race (Non-Standard Distance)"
 
 def format_activity_date(raw_date):
@@ -41,49 +59,58 @@ def format_activity_date(raw_date):
         return raw_date
     
     # Split by 'T' if present
-    if 'T' in raw_date.rstrip('Z'):
-        date_part, time_part = raw_date.rstrip('Z').split('T')
+    trimmed = raw_date.rstrip('Z')
+    if 'T' in trimmed:
+        date_part, time_part = trimmed.split('T')
         # Reformat date from YYYY-MM-DD to DD-MM-YYYY
         date_parts = date_part.split('-')
-        time_clean = time_part.split('.')[0]  # Remove milliseconds
-        time_no_seconds = time_clean[:5]  # HH:MM only (remove :SS)
+        time_no_seconds = time_part[:5]  # HH:MM only (remove :SS)
+        if '.' in time_no_seconds:
+            time_no_seconds = time_no_seconds.split('.')[0]  # Remove milliseconds
         return f"{date_parts[2]}-{date_parts[1]}-{date_parts[0]} {time_no_seconds}"
     
     return raw_date
 
-def extract_week_dates_from_plan(plan_text):
+def extract_week_dates_from_plan(plan_text, today=None):
     """
     Extract week start and end dates from plan markdown.
     Returns list of tuples: [(week_num, start_date, end_date, title), ...]
+    Week years are inferred from today, which defaults to the current date.
     """
-    lines = plan_text.splitlines()
-    today = datetime.now().date()
+    if today is None:
+        today = datetime.now().date()
+    year, month = today.year, today.month
+    is_header = WEEK_HEADER_LINE_RE.match
+    find_date_range = DATE_RANGE_RE.search
     
     all_weeks = []
-    for i, line in enumerate(lines):
-        is_header = line.strip().startswith('###') or line.strip().startswith('**Week')
-        if not is_header:
+    offset = 0
+    for i, line in enumerate(plan_text.splitlines(keepends=True)):
+        line_start = offset
+        offset += len(line)
+        if not is_header(line):
             continue
 
-        date_range_match = re.search(r'(\w+\s\d{1,2})[a-z]{2}\s*-\s*(\w+\s\d{1,2})[a-z]{2}', line)
+        date_range_match = find_date_range(line)
         if date_range_match:
             start_str, end_str = date_range_match.groups()
-            for date_format in ["%B %d %Y", "%b %d %Y"]:
+            for month_numbers in MONTH_NUMBERS:
                 try:
-                    start_date = datetime.strptime(f"{start_str} {today.year}", date_format).date()
-                    end_date = datetime.strptime(f"{end_str} {today.year}", date_format).date()
+                    start_date = _parse_month_day(start_str, year, month_numbers)
+                    end_date = _parse_month_day(end_str, year, month_numbers)
                     
                     # Handle year transitions
                     if start_date.month > end_date.month:
-                        if today.month < start_date.month:
-                            start_date = start_date.replace(year=today.year - 1)
+                        if month < start_date.month:
+                            start_date = start_date.replace(year=year - 1)
                         else:
-                            end_date = end_date.replace(year=today.year + 1)
+                            end_date = end_date.replace(year=year + 1)
                     
                     all_weeks.append({
                         'start_date': start_date,
                         'end_date': end_date,
                         'index': i,
+                        'offset': line_start,
                         'title': line.strip()
                     })
                     break
@@ -5,9 +5,50 @@ This module provides VDOT calculations based on Jack Daniels' Running Formula.
 It uses a CSV lookup table as the source of truth to avoid AI calculation errors.
 """
 import csv
+from bisect import bisect_left
 from typing import Optional, Dict, Tuple
 from pathlib import Path
 
+# Input distance (upper-cased, spaces removed) -> CSV column name
+RACE_COLUMNS = {
+    '1500M': 'Race_1.5km',
+    '1.5K': 'Race_1.5km',
+    '1.5KM': 'Race_1.5km',
+    'MILE': 'Race_Mile',
+    '1MILE': 'Race_Mile',
+    '3K': 'Race_3km',
+    '3000M': 'Race_3km',
+    '3KM': 'Race_3km',
+    '2MILE': 'Race_2_mile',
+    '2MILES': 'Race_2_mile',
+    '5K': 'Race_5k',
+    '5000M': 'Race_5k',
+    '5KM': 'Race_5k',
+    '10K': 'Race_10k',
+    '10000M': 'Race_10k',
+    '10KM': 'Race_10k',
+    '15K': 'Race_15km',
+    '15000M': 'Race_15km',
+    '15KM': 'Race_15km',
+    'HM': 'Race_Half_Marathon',
+    'HALF': 'Race_Half_Marathon',
+    'HALF_MARATHON': 'Race_Half_Marathon',
+    'HALFMARATHON': 'Race_Half_Marathon',
+    '21K': 'Race_Half_Marathon',
+    'MARATHON': 'Race_Marathon',
+    '42K': 'Race_Marathon',
+    '42.2K': 'Race_Marathon',
+    'FULL': 'Race_Marathon'
+}
+
+# Race distances in meters for the formula fallback (anything else is treated as 5K)
+FALLBACK_DISTANCE_METERS = {
+    '5K': 5000,
+    '10K': 10000,
+    'HM': 21097.5,
+    'MARATHON': 42195
+}
+
 
 class VDOTCalculator:
     """
@@ -25,6 +66,10 @@ class VDOTCalculator:
         """
         self.vdot_table = {}
         self.csv_path = csv_path or 'data/vdot_table.csv'
+        self._race_time_index = {}  # column name -> (times, best_vdots), see _race_time_lookup
+        self._closest_vdots = {}  # requested VDOT -> closest VDOT in table
+        self._equivalent_times = {}  # table VDOT -> get_equivalent_times result
+        self._training_paces = {}  # table VDOT -> get_training_paces result
         self._load_table()
     
     def _load_table(self):
@@ -97,39 +142,7 @@ class VDOTCalculator:
             # Fallback to formula if CSV not loaded
             return self._calculate_vdot_fallback(distance, time_seconds)
         
-        # Map input distance to CSV column names
-        distance_map = {
-            '1500M': 'Race_1.5km',
-            '1.5K': 'Race_1.5km',
-            '1.5KM': 'Race_1.5km',
-            'MILE': 'Race_Mile',
-            '1MILE': 'Race_Mile',
-            '3K': 'Race_3km',
-            '3000M': 'Race_3km',
-            '3KM': 'Race_3km',
-            '2MILE': 'Race_2_mile',
-            '2MILES': 'Race_2_mile',
-            '5K': 'Race_5k',
-            '5000M': 'Race_5k',
-            '5KM': 'Race_5k',
-            '10K': 'Race_10k',
-            '10000M': 'Race_10k',
-            '10KM': 'Race_10k',
-            '15K': 'Race_15km',
-            '15000M': 'Race_15km',
-            '15KM': 'Race_15km',
-            'HM': 'Race_Half_Marathon',
-            'HALF': 'Race_Half_Marathon',
-            'HALF_MARATHON': 'Race_Half_Marathon',
-            'HALFMARATHON': 'Race_Half_Marathon',
-            '21K': 'Race_Half_Marathon',
-            'MARATHON': 'Race_Marathon',
-            '42K': 'Race_Marathon',
-            '42.2K': 'Race_Marathon',
-            'FULL': 'Race_Marathon'
-        }
-        
-        column_name = distance_map.get(distance.upper().replace(' ', ''), None)
+        column_name = RACE_COLUMNS.get(distance.upper().replace(' ', ''))
         
         if not column_name:
             print(f"⚠️  Unknown distance: {distance}")
@@ -137,34 +150,56 @@ class VDOTCalculator:
         
         # Find the highest VDOT where athlete's time meets or beats the standard
         # VDOT is a threshold - you only achieve it by running that fast or faster
-        qualified_vdots = []
+        # (lower time = faster, so the athlete qualifies where actual_time <= table_time)
+        times, best_vdots = self._race_time_lookup(column_name)
+        i = bisect_left(times, time_seconds)
         
-        for vdot, row in self.vdot_table.items():
-            if column_name not in row or not row[column_name]:
-                continue
-            
-            # Parse time from CSV
-            table_time = self._parse_time(row[column_name])
-            if table_time is None:
-                continue
-            
-            # Athlete qualifies for this VDOT if their time is equal to or faster
-            # (lower time = faster, so actual_time <= table_time)
-            if time_seconds <= table_time:
-                qualified_vdots.append((vdot, table_time))
-        
-        if not qualified_vdots:
+        if i == len(times):
             # Athlete didn't meet any VDOT standard in the table
             print(f"⚠️  Time {time_seconds}s for {distance} slower than lowest VDOT in table")
             return self._calculate_vdot_fallback(distance, time_seconds)
         
         # Take the highest VDOT the athlete qualified for
         # This automatically rounds down - you get credit for what you achieved
-        best_vdot = max(qualified_vdots, key=lambda x: x[0])[0]
+        best_vdot = best_vdots[i]
         
         print(f"✅ VDOT lookup: {distance} in {time_seconds}s → VDOT {best_vdot}")
         return best_vdot
     
+    def _race_time_lookup(self, column_name: str) -> Tuple[list, list]:
+        """
+        Sorted lookup for one race column, built on first use.
+        
+        Returns:
+            (times, best_vdots): the column's parsed table times in ascending order,
+            and for each position the highest VDOT among that row and every slower one,
+            so bisect_left(times, t) indexes the best VDOT a time t qualifies for
+        """
+        lookup = self._race_time_index.get(column_name)
+        if lookup is None:
+            rows = []
+            for vdot, row in self.vdot_table.items():
+                if column_name not in row or not row[column_name]:
+                    continue
+                
+                # Parse time from CSV
+                table_time = self._parse_time(row[column_name])
+                if table_time is not None:
+                    rows.append((table_time, vdot))
+            rows.sort(key=lambda r: r[0])
+            
+            best_vdots = []
+            best = None
+            for _, vdot in reversed(rows):
+                if best is None or vdot > best:
+                    best = vdot
+                best_vdots.append(best)
+            best_vdots.reverse()
+            
+            lookup = ([table_time for table_time, _ in rows], best_vdots)
+            self._race_time_index[column_name] = lookup
+        return lookup
+    
     def _parse_time(self, time_str: str) -> Optional[int]:
         """
         Parse time string to seconds.
@@ -230,12 +265,7 @@ class VDOTCalculator:
         import math
         
         # Convert distance to meters
-        distance_meters = {
-            '5K': 5000,
-            '10K': 10000,
-            'HM': 21097.5,
-            'MARATHON': 42195
-        }.get(distance.upper(), 5000)
+        distance_meters = FALLBACK_DISTANCE_METERS.get(distance.upper(), 5000)
         
         # Calculate velocity in meters/minute
         time_minutes = time_seconds / 60.0
@@ -256,6 +286,15 @@ class VDOTCalculator:
         
         return round(vdot, 1)
     
+    def _closest_vdot(self, vdot: float) -> float:
+        """Closest VDOT in the table to `vdot` (first one on ties), memoized per requested value."""
+        closest_vdot = self._closest_vdots.get(vdot)
+        if closest_vdot is None:
+            closest_vdot = min(self.vdot_table.keys(), 
+                              key=lambda x: abs(x - vdot))
+            self._closest_vdots[vdot] = closest_vdot
+        return closest_vdot
+    
     def get_equivalent_times(self, vdot: float) -> Dict[str, str]:
         """
         Get equivalent race times for a given VDOT.
@@ -269,21 +308,22 @@ class VDOTCalculator:
         if not self.vdot_table:
             return {}
         
-        # Find closest VDOT in table
-        closest_vdot = min(self.vdot_table.keys(), 
-                          key=lambda x: abs(x - vdot))
-        
-        row = self.vdot_table[closest_vdot]
-        
-        # Return all race distance times
-        equivalent_times = {}
-        for key, value in row.items():
-            if key.startswith('Race_') and value:
-                # Clean up column name: Race_5k -> 5k, Race_Half_Marathon -> Half Marathon
-                distance_name = key.replace('Race_', '').replace('_', ' ')
-                equivalent_times[distance_name] = value
-        
-        return equivalent_times
+        closest_vdot = self._closest_vdot(vdot)
+        equivalent_times = self._equivalent_times.get(closest_vdot)
+        if equivalent_times is None:
+            row = self.vdot_table[closest_vdot]
+            
+            # Return all race distance times
+            equivalent_times = {}
+            for key, value in row.items():
+                if key.startswith('Race_') and value:
+                    # Clean up column name: Race_5k -> 5k, Race_Half_Marathon -> Half Marathon
+                    distance_name = key.replace('Race_', '').replace('_', ' ')
+                    equivalent_times[distance_name] = value
+            self._equivalent_times[closest_vdot] = equivalent_times
+        
+        # Callers store/modify the result, so hand out a copy of the cached dict
+        return dict(equivalent_times)
     
     def get_training_paces(self, vdot: float) -> Dict[str, str]:
         """
@@ -316,9 +356,11 @@ class VDOTCalculator:
         if not self.vdot_table:
             return {}
         
-        # Find closest VDOT in table
-        closest_vdot = min(self.vdot_table.keys(), 
-                          key=lambda x: abs(x - vdot))
+        closest_vdot = self._closest_vdot(vdot)
+        training_paces = self._training_paces.get(closest_vdot)
+        if training_paces is not None:
+            # Callers store/modify the result, so hand out a copy of the cached dict
+            return dict(training_paces)
         
         row = self.vdot_table[closest_vdot]
         
@@ -351,7 +393,8 @@ class VDOTCalculator:
                 display_name = col.replace('_', ' ').replace('Pace ', '')
                 training_paces[display_name] = row[col]
         
-        return training_paces
+        self._training_paces[closest_vdot] = training_paces
+        return dict(training_paces)
     
     def suggest_training_paces(self, vdot: float) -> Dict[str, str]:
         """
@@ -228,8 +228,8 @@ def prepare_vdot_context(user_data: Dict[str, Any], debug: bool = True) -> Dict[
                 print(f"   Will calculate from VDOT {int(vdot_value)}")
             
             try:
-                from utils.vdot_calculator import VDOTCalculator
-                calc = VDOTCalculator()
+                from utils.vdot_calculator import vdot_calculator
+                calc = vdot_calculator
                 paces = calc.get_training_paces(int(vdot_value))
                 
                 if paces: